@@ -2,6 +2,15 @@
 import sys
 sys.dont_write_bytecode = True
 
+# Em produção o Socket.IO roda sobre gevent: threads, sockets e esperas da
+# biblioteca padrão precisam ser cooperativos, senão cada chamada bloqueante
+# (banco, hashing de senha) trava todos os greenlets. Tem que vir antes dos
+# outros imports.
+import os
+if os.environ.get('RENDER'):
+    from gevent import monkey
+    monkey.patch_all()
+
 # Importações necessárias do Flask e extensões
 from flask import Flask, jsonify
 from flask_cors import CORS
@@ -20,6 +29,14 @@ app = Flask(__name__)
 # Carrega configurações
 app.config.from_object(Config)
 
+# Serialização JSON mais rápida (orjson, se instalado)
+from json_provider import install_json_provider
+json_provider = install_json_provider(app)
+
+# Orçamento de chamadas ao banco por requisição (Server-Timing e aviso no log)
+from query_metrics import install_query_budget
+install_query_budget(app)
+
 # Configurar CORS para permitir credenciais (cookies de sessão)
 CORS(app, 
      supports_credentials=True, 
@@ -28,16 +45,30 @@ CORS(app,
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
 
 # Inicializa SocketIO para comunicação em tempo real
-import os
 is_production = os.environ.get('RENDER', False)
 async_mode = 'gevent' if is_production else 'threading'
 
-socketio = SocketIO(app, cors_allowed_origins=Config.CORS_ORIGINS, manage_session=False, async_mode=async_mode)
+# Com vários workers, as emissões passam pelo barramento configurado (SOCKETIO_MESSAGE_QUEUE)
+from message_bus import message_queue_options
+socketio = SocketIO(app, cors_allowed_origins=Config.CORS_ORIGINS, manage_session=False, async_mode=async_mode,
+                    **message_queue_options(Config.SOCKETIO_MESSAGE_QUEUE))
+
+# Eventos de chat em tempo real (salas por conversa)
+from routes.chat import register_chat_events
+register_chat_events(socketio)
+
+# Avisos de invalidação de cache entre os workers (mesmo barramento do Socket.IO)
+from message_bus import invalidation_bus
+invalidation_bus.start(socketio, Config.SOCKETIO_MESSAGE_QUEUE)
 
 # Registra todas as rotas da aplicação (endpoints)
 print("🔌 Registrando rotas...")
 register_routes(app)
 
+# Conclusão automática de agendamentos passados (apenas um worker executa)
+from services import auto_complete_scheduler
+auto_complete_scheduler.start(socketio)
+
 
 @app.errorhandler(404)
 def handler_404(_):
@@ -90,6 +121,7 @@ if __name__ == "__main__":
     print(f"  🔧 Modo: {'Produção' if os.environ.get('RENDER') else 'Desenvolvimento'}")
     print(f"  🔌 Async mode: {async_mode}")
     print(f"  🗄️  Database: Supabase")
+    print(f"  🧾 JSON: {json_provider}")
     print("=" * 60)
     print()
     
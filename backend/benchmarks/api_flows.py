@@ -0,0 +1,312 @@
+"""Benchmark das rotas do backend sobre o stand-in local do Supabase.
+
+Sobe o app real (rotas, serviços, caches e eventos do Socket.IO) com o
+``SupabaseDB`` ligado ao ``benchmarks.standin``, popula o banco em memória e
+executa os fluxos principais com N threads, cada uma com seus próprios
+clientes de teste. Para cada fluxo reporta latência (p50/p95/p99) e
+requisições por segundo. A latência de cada consulta ao banco é simulada
+com ``--latency-ms`` e ``--jitter-ms``.
+
+Uso (no diretório backend)::
+
+    python -m benchmarks.api_flows --iterations 500 --concurrency 8
+    python -m benchmarks.api_flows --json > baseline.json
+    python -m benchmarks.api_flows --baseline baseline.json --tolerance 0.25
+
+Com ``--baseline``, termina com código 1 se o p95 de algum fluxo piorar mais
+que a tolerância em relação ao relatório salvo (uso em CI).
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+# Antes de importar o app: sem agendador em segundo plano e sem barramento entre processos
+os.environ.setdefault('AUTO_COMPLETE_INTERVAL', '0')
+os.environ.setdefault('SOCKETIO_MESSAGE_QUEUE', '')
+
+from werkzeug.security import generate_password_hash
+
+# Mensagens de inicialização do app vão para stderr, deixando stdout para o relatório
+with contextlib.redirect_stdout(sys.stderr):
+    from app import app, socketio
+from database import db
+
+from . import standin
+from .stats import summarize
+
+PASSWORD = 'benchmark123'
+TIMES = [f'{hour:02d}:{minute:02d}' for hour in range(9, 18) for minute in (0, 30)]
+
+
+def seed(store, professionals, clients, appointments_per_client):
+    """Popula o banco em memória com um cenário parecido com o de produção."""
+    password_hash = generate_password_hash(PASSWORD)
+    store.seed('services', [
+        {'nome': name, 'preco': price, 'duracao': 30, 'ativo': True}
+        for name, price in (('Corte', 40.0), ('Barba', 30.0), ('Corte + Barba', 60.0),
+                            ('Sobrancelha', 15.0), ('Pigmentação', 50.0))
+    ])
+    barbers = store.seed('professionals', [
+        {'nome': f'Profissional {n}', 'email': f'profissional{n}@bench.local', 'senha': password_hash,
+         'telefone': '11999990000', 'endereco': 'Rua A, 1', 'categoria': 'Barbeiro',
+         'especialidades': ['Corte', 'Barba'], 'preco_base': 40.0, 'bio': '', 'ativo': True,
+         'avaliacao': 4.5, 'total_avaliacoes': 10, 'disponibilidade': None}
+        for n in range(professionals)
+    ])
+    store.seed('working_hours', [
+        {'profissional_id': barber['id'], 'dia_semana': day, 'hora_inicio': '09:00:00',
+         'hora_fim': '18:00:00', 'intervalo_inicio': '12:00:00', 'intervalo_fim': '13:00:00', 'ativo': True}
+        for barber in barbers for day in range(1, 7)
+    ])
+    users = store.seed('clientes', [
+        {'nome': f'Cliente {n}', 'email': f'cliente{n}@bench.local', 'senha': password_hash,
+         'telefone': '11988880000', 'endereco': 'Rua B, 2'}
+        for n in range(clients)
+    ])
+
+    today = date.today()
+    rows = []
+    for user in users:
+        for n in range(appointments_per_client):
+            barber = barbers[(user['id'] + n) % len(barbers)]
+            day = today + timedelta(days=n - appointments_per_client // 2)
+            rows.append({
+                'id': f"seed-{user['id']}-{n}", 'cliente': user['nome'], 'cliente_email': user['email'],
+                'cliente_id': user['id'], 'profissional': barber['nome'], 'profissional_id': barber['id'],
+                'servico': 'Corte', 'servico_id': 1, 'date': day.isoformat(), 'time': TIMES[n % len(TIMES)],
+                'status': 'concluido' if day < today else 'agendado', 'total_price': 40.0
+            })
+    store.seed('appointments', rows)
+    return barbers, users
+
+
+class Worker:
+    """Clientes de teste (HTTP e Socket.IO) de uma thread, logados como um cliente."""
+
+    def __init__(self, index, barbers, users):
+        self.index = index
+        self.barbers = barbers
+        self.user = users[index % len(users)]
+        self.barber = barbers[index % len(barbers)]
+
+        self.client = app.test_client()
+        with self.client.session_transaction() as sess:
+            sess.update({'user_id': self.user['id'], 'user_type': 'client', 'user_name': self.user['nome']})
+
+        self.professional = app.test_client()
+        with self.professional.session_transaction() as sess:
+            sess.update({'user_id': self.barber['id'], 'user_type': 'professional'})
+
+        self.etags = {}
+        self.socket = None
+        self.conversation_id = None
+        self.last_message_id = None
+
+    def open_chat(self):
+        self.socket = socketio.test_client(app, flask_test_client=self.client)
+        ack = self.socket.emit('chat:join', {'professional_id': self.barber['id']}, callback=True)
+        self.conversation_id = ack['conversation']['id']
+
+    def close(self):
+        if self.socket is not None and self.socket.is_connected():
+            self.socket.disconnect()
+
+
+def flow_login(worker, n):
+    response = worker.client.post('/api/auth/login', json={'email': worker.user['email'], 'password': PASSWORD})
+    return response.status_code
+
+
+def flow_booking(worker, n):
+    # Poucos horários para muitos pedidos: parte das reservas cai na verificação de conflito (409)
+    barber = worker.barbers[n % len(worker.barbers)]
+    day = date.today() + timedelta(days=1 + (n // len(TIMES)) % 14)
+    response = worker.client.post('/api/appointments', json={
+        'barberId': barber['id'], 'barberName': barber['nome'], 'serviceId': 1, 'serviceName': 'Corte',
+        'date': day.isoformat(), 'time': TIMES[(n * 7 + worker.index) % len(TIMES)], 'totalPrice': 40.0
+    })
+    return response.status_code
+
+
+def flow_dashboard_client(worker, n):
+    return worker.client.get('/api/user/dashboard').status_code
+
+
+def flow_dashboard_professional(worker, n):
+    return worker.professional.get('/api/user/dashboard').status_code
+
+
+def flow_catalog(worker, n):
+    # Alterna entre as duas listas; repete com If-None-Match como um navegador com cache
+    path = '/api/barbers' if n % 2 == 0 else '/api/services'
+    headers = {'If-None-Match': worker.etags[path]} if path in worker.etags else {}
+    response = worker.client.get(path, headers=headers)
+    if response.headers.get('ETag'):
+        worker.etags[path] = response.headers['ETag']
+    return response.status_code
+
+
+def flow_chat(worker, n):
+    if worker.socket is None:
+        worker.open_chat()
+    ack = worker.socket.emit('chat:send', {'conversation_id': worker.conversation_id,
+                                           'content': f'mensagem {n}'}, callback=True)
+    if not ack or not ack.get('success'):
+        return 500
+    sync = worker.socket.emit('chat:sync', {'conversation_id': worker.conversation_id,
+                                            'after_id': worker.last_message_id}, callback=True)
+    worker.socket.get_received()
+    if sync and sync.get('messages'):
+        worker.last_message_id = sync['messages'][-1]['id']
+    return 200 if sync and sync.get('success') else 500
+
+
+FLOWS = {
+    'login': flow_login,
+    'booking': flow_booking,
+    'dashboard_client': flow_dashboard_client,
+    'dashboard_professional': flow_dashboard_professional,
+    'catalog': flow_catalog,
+    'chat': flow_chat
+}
+
+# Respostas esperadas de cada fluxo (o resto conta como erro)
+EXPECTED_STATUS = {
+    'booking': {201, 409},
+    'catalog': {200, 304}
+}
+
+
+def run_flow(name, workers, iterations, store):
+    """Executa ``iterations`` chamadas do fluxo divididas entre as threads."""
+    flow = FLOWS[name]
+    expected = EXPECTED_STATUS.get(name, {200})
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    counter = iter(range(iterations))
+    queries_before = store.queries
+
+    def worker_loop(worker):
+        local_latencies, local_statuses = [], Counter()
+        while True:
+            with lock:
+                n = next(counter, None)
+            if n is None:
+                break
+            start = time.perf_counter()
+            try:
+                status = flow(worker, n)
+            except Exception as e:
+                status = type(e).__name__
+            local_latencies.append(time.perf_counter() - start)
+            local_statuses[status] += 1
+        with lock:
+            latencies.extend(local_latencies)
+            statuses.update(local_statuses)
+
+    threads = [threading.Thread(target=worker_loop, args=(worker,)) for worker in workers]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    errors = sum(count for status, count in statuses.items() if status not in expected)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'status': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'queries_per_request': round((store.queries - queries_before) / len(latencies), 2) if latencies else 0.0,
+        'latency': summarize(latencies)
+    }
+
+
+def run(flows, iterations, concurrency, latency_ms, jitter_ms, professionals, clients):
+    store = standin.install(db, latency_ms=latency_ms, jitter_ms=jitter_ms)
+    barbers, users = seed(store, professionals, max(clients, concurrency), appointments_per_client=20)
+    workers = [Worker(n, barbers, users) for n in range(concurrency)]
+
+    report = {
+        'config': {'iterations': iterations, 'concurrency': concurrency, 'latency_ms': latency_ms,
+                   'jitter_ms': jitter_ms, 'professionals': professionals, 'clients': len(users)},
+        'flows': {}
+    }
+    try:
+        # As rotas imprimem logs de depuração; ficam fora da saída do benchmark
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for name in flows:
+                report['flows'][name] = run_flow(name, workers, iterations, store)
+    finally:
+        for worker in workers:
+            worker.close()
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Fluxos cujo p95 piorou mais que ``tolerance`` (fração) em relação ao baseline."""
+    regressions = []
+    for name, result in report['flows'].items():
+        previous = baseline.get('flows', {}).get(name)
+        if not previous or not previous['latency']['p95_ms']:
+            continue
+        before, after = previous['latency']['p95_ms'], result['latency']['p95_ms']
+        if after > before * (1 + tolerance):
+            regressions.append(f'{name}: p95 {before} ms -> {after} ms (+{(after / before - 1) * 100:.0f}%)')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--flows', default=','.join(FLOWS), help=f'fluxos separados por vírgula ({", ".join(FLOWS)})')
+    parser.add_argument('--iterations', type=int, default=200, help='requisições por fluxo')
+    parser.add_argument('--concurrency', type=int, default=4, help='threads simultâneas')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='latência de cada consulta ao banco')
+    parser.add_argument('--jitter-ms', type=float, default=1.0, help='variação máxima somada à latência')
+    parser.add_argument('--professionals', type=int, default=10)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--baseline', help='relatório JSON anterior para comparar o p95')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='piora aceita no p95 (0.2 = 20%%)')
+    parser.add_argument('--json', action='store_true', help='saída em JSON')
+    args = parser.parse_args()
+
+    flows = [name.strip() for name in args.flows.split(',') if name.strip()]
+    unknown = [name for name in flows if name not in FLOWS]
+    if unknown:
+        parser.error(f'fluxos desconhecidos: {", ".join(unknown)}')
+
+    report = run(flows, args.iterations, args.concurrency, args.latency_ms, args.jitter_ms,
+                 args.professionals, args.clients)
+
+    if args.json:
+        print(json.dumps(report))
+    else:
+        config = report['config']
+        print(f"{config['iterations']} requisições por fluxo, {config['concurrency']} threads, "
+              f"banco {config['latency_ms']} ms (+até {config['jitter_ms']} ms)")
+        print(f"{'fluxo':<24}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'consultas':>11}{'erros':>7}")
+        for name, result in report['flows'].items():
+            latency = result['latency']
+            print(f"{name:<24}{result['rps']:>9}{latency['p50_ms']:>9}{latency['p95_ms']:>9}"
+                  f"{latency['p99_ms']:>9}{result['queries_per_request']:>11}{result['errors']:>7}")
+
+    failed = any(result['errors'] for result in report['flows'].values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f'REGRESSÃO {line}', file=sys.stderr)
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
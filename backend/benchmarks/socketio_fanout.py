@@ -0,0 +1,147 @@
+"""Benchmark do barramento do Socket.IO entre processos.
+
+Sobe N processos assinantes (como se fossem workers) e publica M mensagens
+pelo mesmo ``client_manager`` que o app usa. Mede a latência de entrega
+(publicação -> recebimento em cada worker) e a vazão de publicação e de
+entrega.
+
+Uso (no diretório backend)::
+
+    python -m benchmarks.socketio_fanout --workers 4 --messages 5000
+    python -m benchmarks.socketio_fanout --url redis://localhost:6379/0
+"""
+import argparse
+import json
+import multiprocessing
+import queue
+import shutil
+import tempfile
+import time
+
+from message_bus import make_pubsub_manager
+
+from .stats import summarize
+
+CHANNEL = 'benchmark'
+
+
+def _make_manager(url):
+    return make_pubsub_manager(url, CHANNEL)
+
+
+def _subscriber(url, worker, results):
+    manager = _make_manager(url)
+    latencies = []
+    ready = False
+    for raw in manager._listen():
+        received = time.monotonic()
+        message = raw if isinstance(raw, dict) else json.loads(raw)
+        method = message.get('method')
+        if method == 'emit':
+            latencies.append(received - message['ts'])
+        elif method == 'ping' and not ready:
+            ready = True
+            results.put(('ready', worker, None))
+        elif method == 'done':
+            break
+    results.put(('done', worker, latencies))
+
+
+def run(url, workers, messages, size, timeout):
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_subscriber, args=(url, n, results), daemon=True)
+                 for n in range(workers)]
+    for process in processes:
+        process.start()
+
+    publisher = _make_manager(url)
+
+    # Aguarda todos os assinantes estarem ouvindo
+    ready = set()
+    deadline = time.monotonic() + timeout
+    while len(ready) < workers:
+        if time.monotonic() > deadline:
+            raise SystemExit(f'Apenas {len(ready)} de {workers} workers ficaram prontos')
+        publisher._publish({'method': 'ping'})
+        try:
+            while True:
+                kind, worker, _ = results.get(timeout=0.05)
+                if kind == 'ready':
+                    ready.add(worker)
+        except queue.Empty:
+            pass
+
+    payload = 'x' * size
+    start = time.monotonic()
+    for seq in range(messages):
+        publisher._publish({'method': 'emit', 'seq': seq, 'ts': time.monotonic(), 'data': payload})
+    publish_elapsed = time.monotonic() - start
+    for _ in range(3):
+        publisher._publish({'method': 'done'})
+
+    latencies = []
+    finished = 0
+    while finished < workers:
+        try:
+            kind, _, data = results.get(timeout=timeout)
+        except queue.Empty:
+            break
+        if kind == 'done':
+            finished += 1
+            latencies.extend(data)
+    total_elapsed = time.monotonic() - start
+
+    for process in processes:
+        process.join(timeout=1)
+        if process.is_alive():
+            process.terminate()
+
+    expected = messages * workers
+    return {
+        'url': url,
+        'workers': workers,
+        'messages': messages,
+        'payload_bytes': size,
+        'publish_per_s': round(messages / publish_elapsed, 1) if publish_elapsed else 0.0,
+        'delivered': len(latencies),
+        'lost': expected - len(latencies),
+        'deliveries_per_s': round(len(latencies) / total_elapsed, 1) if total_elapsed else 0.0,
+        'latency': summarize(latencies)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='barramento (padrão: unix:// em um diretório temporário)')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--size', type=int, default=200, help='bytes de conteúdo por mensagem')
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--json', action='store_true', help='saída em JSON')
+    args = parser.parse_args()
+
+    directory = None
+    url = args.url
+    if not url:
+        directory = tempfile.mkdtemp(prefix='groomly-bus-')
+        url = f'unix://{directory}'
+    try:
+        report = run(url, args.workers, args.messages, args.size, args.timeout)
+    finally:
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    latency = report['latency']
+    print(f"barramento:         {report['url']}")
+    print(f"workers:            {report['workers']}")
+    print(f"mensagens:          {report['messages']} x {report['payload_bytes']} bytes")
+    print(f"publicação:         {report['publish_per_s']} msg/s")
+    print(f"entregas:           {report['delivered']} ({report['lost']} perdidas), {report['deliveries_per_s']} msg/s")
+    print(f"latência (ms):      p50 {latency['p50_ms']}  p95 {latency['p95_ms']}  p99 {latency['p99_ms']}  máx {latency['max_ms']}")
+
+
+if __name__ == '__main__':
+    main()
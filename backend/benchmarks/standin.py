@@ -0,0 +1,338 @@
+"""Stand-in local do Supabase para os benchmarks.
+
+Implementa, em memória, a parte do cliente PostgREST que o ``SupabaseDB``
+usa: ``table(...)`` com select/insert/upsert/update/delete, os filtros
+(eq, neq, gt, gte, lt, lte, in_, is_, or_), order, limit, range e
+``rpc(...)``. Cada ``execute()`` espera a latência configurada antes de
+responder, simulando a ida e volta até o banco, para que o benchmark
+reflita quantas consultas cada rota faz e se elas rodam em paralelo.
+
+Não é um banco: não há tipos, constraints nem transações. Serve para medir
+o código do backend sem rede e sem um projeto Supabase.
+"""
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+class StandInResponse:
+    """Mesmos campos usados do ``APIResponse`` do postgrest."""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _coerce(current: Any, value: Any) -> Any:
+    """Converte o valor do filtro (em geral texto) para o tipo da coluna."""
+    if isinstance(current, bool):
+        return value in (True, 'true') if isinstance(value, str) else bool(value)
+    if isinstance(current, (int, float)) and isinstance(value, str):
+        try:
+            return type(current)(value)
+        except ValueError:
+            return value
+    if isinstance(current, str) and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+def _compare(op: str, current: Any, value: Any) -> bool:
+    if current is None:
+        return False
+    value = _coerce(current, value)
+    try:
+        if op == 'eq':
+            return current == value
+        if op == 'neq':
+            return current != value
+        if op == 'gt':
+            return current > value
+        if op == 'gte':
+            return current >= value
+        if op == 'lt':
+            return current < value
+        return current <= value
+    except TypeError:
+        return False
+
+
+def _split_top_level(expr: str) -> List[str]:
+    """Separa por vírgulas fora de parênteses e aspas."""
+    parts, depth, quoted, current = [], 0, False, ''
+    for ch in expr:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        if ch == ',' and depth == 0 and not quoted:
+            parts.append(current)
+            current = ''
+        else:
+            current += ch
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _parse_logic(expr: str) -> Callable[[Dict], bool]:
+    """Converte uma expressão do PostgREST (``or(a.eq.1,and(...))``) em predicado."""
+    match = re.match(r'^(and|or)\((.*)\)$', expr)
+    if match:
+        predicates = [_parse_logic(part) for part in _split_top_level(match.group(2))]
+        combine = all if match.group(1) == 'and' else any
+        return lambda row: combine(p(row) for p in predicates)
+
+    column, op, value = expr.split('.', 2)
+    value = value.strip('"')
+    if op == 'in':
+        values = [v.strip('"') for v in _split_top_level(value.strip('()'))]
+        return lambda row: row.get(column) is not None and str(row.get(column)) in values
+    if op == 'is':
+        return lambda row: row.get(column) is None if value == 'null' else str(row.get(column)).lower() == value
+    return lambda row: _compare(op, row.get(column), value)
+
+
+class QueryBuilder:
+    """Consulta sobre uma tabela do ``InMemoryStore``, encadeável como a do postgrest."""
+
+    def __init__(self, store: 'InMemoryStore', table: str):
+        self.store = store
+        self.table = table
+        self.operation = 'select'
+        self.columns = '*'
+        self.payload = None
+        self.filters: List[Callable[[Dict], bool]] = []
+        self.orders: List[tuple] = []
+        self.row_limit: Optional[int] = None
+        self.row_range: Optional[tuple] = None
+        self.count: Optional[str] = None
+        self.on_conflict = ''
+        self.ignore_duplicates = False
+
+    # Operações
+    def select(self, *columns: str, count: Optional[str] = None, **kwargs):
+        if self.operation == 'select' and columns:
+            self.columns = ','.join(columns)
+        self.count = count
+        return self
+
+    def insert(self, data, count: Optional[str] = None, **kwargs):
+        self.operation, self.payload, self.count = 'insert', data, count
+        return self
+
+    def upsert(self, data, on_conflict: str = '', ignore_duplicates: bool = False, **kwargs):
+        self.operation, self.payload = 'upsert', data
+        self.on_conflict, self.ignore_duplicates = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, data, count: Optional[str] = None, **kwargs):
+        self.operation, self.payload, self.count = 'update', data, count
+        return self
+
+    def delete(self, count: Optional[str] = None, **kwargs):
+        self.operation, self.count = 'delete', count
+        return self
+
+    # Filtros
+    def _filter(self, op: str, column: str, value: Any):
+        self.filters.append(lambda row: _compare(op, row.get(column), value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter('eq', column, value)
+
+    def neq(self, column, value):
+        return self._filter('neq', column, value)
+
+    def gt(self, column, value):
+        return self._filter('gt', column, value)
+
+    def gte(self, column, value):
+        return self._filter('gte', column, value)
+
+    def lt(self, column, value):
+        return self._filter('lt', column, value)
+
+    def lte(self, column, value):
+        return self._filter('lte', column, value)
+
+    def in_(self, column, values):
+        values = {str(v) for v in values}
+        self.filters.append(lambda row: row.get(column) is not None and str(row.get(column)) in values)
+        return self
+
+    def is_(self, column, value):
+        value = 'null' if value is None else str(value).lower()
+        self.filters.append(_parse_logic(f'{column}.is.{value}'))
+        return self
+
+    def or_(self, filters: str, **kwargs):
+        self.filters.append(_parse_logic(f'or({filters})'))
+        return self
+
+    def match(self, query: Dict[str, Any]):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    # Modificadores
+    def order(self, column: str, desc: bool = False, **kwargs):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs):
+        self.row_limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs):
+        self.row_range = (start, end)
+        return self
+
+    def _project(self, row: Dict) -> Dict:
+        if self.columns in ('*', '', None):
+            return dict(row)
+        return {c.strip(): row.get(c.strip()) for c in self.columns.split(',')}
+
+    def execute(self) -> StandInResponse:
+        self.store.wait()
+        with self.store.lock:
+            self.store.queries += 1
+            if self.operation in ('insert', 'upsert'):
+                return self._write()
+            rows = self.store.tables.setdefault(self.table, [])
+            selected = [row for row in rows if all(f(row) for f in self.filters)]
+            if self.operation == 'update':
+                for row in selected:
+                    row.update(self.payload)
+                return StandInResponse([dict(r) for r in selected], len(selected) if self.count else None)
+            if self.operation == 'delete':
+                ids = {id(row) for row in selected}
+                self.store.tables[self.table] = [row for row in rows if id(row) not in ids]
+                return StandInResponse([dict(r) for r in selected], len(selected) if self.count else None)
+            return self._read(selected)
+
+    def _write(self) -> StandInResponse:
+        rows = self.store.tables.setdefault(self.table, [])
+        items = self.payload if isinstance(self.payload, list) else [self.payload]
+        keys = [k.strip() for k in self.on_conflict.split(',') if k.strip()] if self.operation == 'upsert' else []
+        written = []
+        for item in items:
+            existing = None
+            if keys:
+                existing = next((row for row in rows if all(str(row.get(k)) == str(item.get(k)) for k in keys)), None)
+            elif self.operation == 'upsert' and 'id' in item:
+                existing = next((row for row in rows if row.get('id') == item['id']), None)
+            if existing is not None:
+                if not self.ignore_duplicates:
+                    existing.update(item)
+                    written.append(dict(existing))
+                continue
+            row = {**self.store.defaults.get(self.table, {}), **item}
+            row.setdefault('id', self.store.next_id(self.table))
+            row.setdefault('created_at', datetime.now().isoformat())
+            rows.append(row)
+            written.append(dict(row))
+        return StandInResponse(written, len(written) if self.count else None)
+
+    def _read(self, rows: List[Dict]) -> StandInResponse:
+        for column, desc in reversed(self.orders):
+            # Nulos no fim, como o padrão do Postgres em ordem crescente
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        total = len(rows)
+        if self.row_range:
+            rows = rows[self.row_range[0]:self.row_range[1] + 1]
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        return StandInResponse([self._project(row) for row in rows], total if self.count else None)
+
+
+class RpcCall:
+    """Chamada de função registrada no ``InMemoryStore``."""
+
+    def __init__(self, store: 'InMemoryStore', name: str, params: Dict):
+        self.store = store
+        self.name = name
+        self.params = params
+
+    def execute(self) -> StandInResponse:
+        try:
+            function = self.store.rpcs[self.name]
+        except KeyError:
+            raise RuntimeError(f"Função '{self.name}' não registrada no stand-in")
+        self.store.wait()
+        with self.store.lock:
+            self.store.queries += 1
+            return StandInResponse(function(self.store, self.params))
+
+
+def _chat_increment_unread(store: 'InMemoryStore', params: Dict) -> int:
+    """Equivalente à função de sql/chat_atomic.sql."""
+    column = 'cliente_unread' if params['p_recipient'] == 'client' else 'profissional_unread'
+    for row in store.tables.get('chat_conversations', []):
+        if row.get('id') == params['p_conversation_id']:
+            row[column] = (row.get(column) or 0) + 1
+            return row[column]
+    return None
+
+
+class InMemoryStore:
+    """Tabelas em memória, ids sequenciais por tabela e modelo de latência."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tables: Dict[str, List[Dict]] = {}
+        self.defaults: Dict[str, Dict[str, Any]] = {
+            'chat_conversations': {'cliente_unread': 0, 'profissional_unread': 0}
+        }
+        self.rpcs: Dict[str, Callable[['InMemoryStore', Dict], Any]] = {
+            'chat_increment_unread': _chat_increment_unread
+        }
+        self.queries = 0
+        self.lock = threading.RLock()
+        self._ids: Dict[str, int] = {}
+        self._random = random.Random(seed)
+
+    def next_id(self, table: str) -> int:
+        self._ids[table] = self._ids.get(table, 0) + 1
+        return self._ids[table]
+
+    def wait(self) -> None:
+        """Espera a latência de uma ida e volta (base + variação uniforme)."""
+        delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def seed(self, table: str, rows: List[Dict]) -> List[Dict]:
+        """Insere linhas diretamente, sem latência; retorna as linhas gravadas."""
+        with self.lock:
+            return StandInClient(self).table(table).insert(rows)._write().data
+
+
+class StandInClient:
+    """Substituto do ``supabase.Client`` ligado a um ``InMemoryStore``."""
+
+    def __init__(self, store: InMemoryStore):
+        self.store = store
+
+    def table(self, name: str) -> QueryBuilder:
+        return QueryBuilder(self.store, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> RpcCall:
+        return RpcCall(self.store, name, params or {})
+
+
+def install(database, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+            store: Optional[InMemoryStore] = None) -> InMemoryStore:
+    """Liga o ``SupabaseDB`` (e o ``concurrent_db``, que o usa) ao stand-in e retorna o store."""
+    store = store or InMemoryStore(latency_ms, jitter_ms)
+    database.set_client_factory(lambda use_service_key: StandInClient(store))
+    return store
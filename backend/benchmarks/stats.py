@@ -0,0 +1,25 @@
+"""Estatísticas comuns aos benchmarks."""
+from typing import Dict, Sequence
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Percentil ``pct`` (0-100) de uma sequência já ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99/média/máximo em milissegundos a partir de latências em segundos."""
+    values = sorted(latencies)
+    if not values:
+        return {'count': 0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'mean_ms': 0.0, 'max_ms': 0.0}
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3)
+    }
@@ -0,0 +1,174 @@
+"""Cache em memória (LRU com expiração) usado pelos serviços."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Cache LRU limitado por tamanho, com expiração por item.
+
+    Seguro para uso entre threads/greenlets; mantém contadores de acertos e
+    falhas para diagnóstico.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o valor ainda válido da chave ou ``default``."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING and item[1] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            if item is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Guarda o valor, descartando o item menos usado se necessário."""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        """Remove a chave, se existir."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Remove os itens para os quais ``predicate(chave, valor)`` é verdadeiro."""
+        with self._lock:
+            keys = [k for k, (v, _) in self._data.items() if predicate(k, v)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Tamanho atual e contadores de acertos/falhas."""
+        with self._lock:
+            return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+
+class StaleWhileRevalidateCache:
+    """Cache read-through com atualização em segundo plano.
+
+    Até ``ttl`` segundos o valor é servido como está; depois, por mais
+    ``stale_ttl`` segundos, o valor antigo continua sendo servido enquanto
+    uma única tarefa em segundo plano recarrega a chave. Passado esse prazo
+    (ou após ``invalidate``) a leitura volta a carregar de forma síncrona.
+
+    ``submit(fn, *args)`` agenda a recarga (por exemplo, no pool de threads
+    compartilhado); o cache não cria threads próprias.
+    """
+
+    def __init__(self, submit: Callable[..., Any], maxsize: int = 128, ttl: float = 60.0,
+                 stale_ttl: float = 300.0):
+        self.submit = submit
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.invalidations = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._generations: Dict[Hashable, int] = {}
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+
+    def _store(self, key: Hashable, value: Any, generation: int) -> None:
+        """Guarda o valor carregado, a menos que a chave tenha sido invalidada no meio."""
+        with self._lock:
+            if self._generations.get(key, 0) != generation:
+                return
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any], generation: int) -> None:
+        try:
+            self._store(key, loader(), generation)
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            print(f"Erro ao atualizar o cache ({key}): {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Any], generation: int) -> None:
+        try:
+            self.submit(self._refresh, key, loader, generation)
+        except RuntimeError as e:
+            # Pool encerrado (desligamento): a próxima leitura tenta de novo
+            self._refreshing.discard(key)
+            print(f"Erro ao agendar a atualização do cache ({key}): {e}")
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Retorna o valor da chave, chamando ``loader()`` quando necessário."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            generation = self._generations.get(key, 0)
+            if item is not _MISSING:
+                age = time.monotonic() - item[1]
+                if age < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return item[0]
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        self._schedule_refresh(key, loader, generation)
+                    return item[0]
+                del self._data[key]
+            self.misses += 1
+
+        value = loader()
+        self._store(key, value, generation)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Descarta a chave; cargas em andamento dela não são guardadas."""
+        with self._lock:
+            self._data.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in self._data:
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Tamanho atual e contadores de acertos, acertos antigos, falhas e recargas."""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,125 @@
+"""Consultas ao banco em paralelo.
+
+``ConcurrentSupabaseDB`` expõe os mesmos métodos do ``SupabaseDB``, mas cada
+chamada apenas monta uma ``DeferredCall`` (nada é executado ainda).
+``run_concurrently`` envia as chamadas para um pool de threads
+compartilhado e devolve os resultados na ordem, então a latência total fica
+próxima à da consulta mais lenta::
+
+    professional, hours = run_concurrently(
+        concurrent_db.get_professional_by_id(pid, projection='card'),
+        concurrent_db.get_working_hours(pid, active_only=True),
+    )
+
+Não há corrotinas nem event loop (não use ``await``): as threads do pool
+esperam o banco e, com o monkey patch do gevent em produção, viram greenlets.
+"""
+import contextvars
+import functools
+import inspect
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, List, Optional
+
+from config import Config
+from database import SupabaseDB, db
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool de threads das consultas, criado uma vez por processo."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=Config.DB_POOL_WORKERS,
+                                           thread_name_prefix='concurrent-db')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def submit_background(fn, *args):
+    """Agenda ``fn(*args)`` no pool compartilhado, fora do contexto da requisição."""
+    return _get_executor().submit(fn, *args)
+
+
+class DeferredCall:
+    """Chamada ao banco montada, mas ainda não executada."""
+
+    def __init__(self, method, args, kwargs):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+    def submit(self, executor: ThreadPoolExecutor):
+        # Copia o contexto para a thread: a chamada conta no orçamento da requisição (g)
+        context = contextvars.copy_context()
+        return executor.submit(context.run, self.method, *self.args, **self.kwargs)
+
+
+class ConcurrentSupabaseDB:
+    """Versão adiada do SupabaseDB (mesmos métodos, retornando ``DeferredCall``).
+
+    As chamadas rodam no pool de threads, via ``run_concurrently``.
+    """
+
+    def __init__(self, sync_db: SupabaseDB):
+        self._db = sync_db
+
+    def on_write(self, table, callback):
+        """Registra o ouvinte de escrita no banco síncrono."""
+        self._db.on_write(table, callback)
+
+
+def _make_deferred(name: str):
+    sync_method = getattr(SupabaseDB, name)
+
+    @functools.wraps(sync_method)
+    def method(self, *args, **kwargs):
+        return DeferredCall(getattr(self._db, name), args, kwargs)
+
+    return method
+
+
+# Gera uma versão adiada de cada método público de consulta/escrita do SupabaseDB
+for _name, _member in inspect.getmembers(SupabaseDB, inspect.isfunction):
+    if _name.startswith('_') or hasattr(ConcurrentSupabaseDB, _name) or inspect.isgeneratorfunction(_member):
+        continue
+    setattr(ConcurrentSupabaseDB, _name, _make_deferred(_name))
+
+
+def run_concurrently(*calls: DeferredCall, limit: Optional[int] = None) -> List[Any]:
+    """Executa as chamadas no pool, no máximo ``limit`` ao mesmo tempo.
+
+    Os resultados voltam na mesma ordem das chamadas; a primeira exceção é
+    propagada.
+    """
+    limit = limit or Config.DB_FANOUT_LIMIT
+    executor = _get_executor()
+    futures = {}
+    waiting = list(enumerate(calls))
+    running = set()
+    while waiting or running:
+        while waiting and len(running) < limit:
+            index, call = waiting.pop(0)
+            future = call.submit(executor)
+            futures[future] = index
+            running.add(future)
+        done, running = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                for pending in running:
+                    pending.cancel()
+                raise future.exception()
+
+    results: List[Any] = [None] * len(calls)
+    for future, index in futures.items():
+        results[index] = future.result()
+    return results
+
+
+# Instância global da camada de consultas em paralelo
+concurrent_db = ConcurrentSupabaseDB(db)
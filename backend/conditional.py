@@ -0,0 +1,95 @@
+"""GET condicional (ETag) a partir de carimbos de versão.
+
+Cada recurso (catálogo, disponibilidade de um profissional...) tem o
+instante da sua última alteração, avisado a todos os workers pelo
+``invalidation_bus``. O ETag é montado a partir desse instante, sem ler o
+banco nem serializar a resposta; se o cliente já tem a versão atual, a rota
+responde 304 sem executar a view.
+
+Um processo não conhece as alterações anteriores ao seu início, e um aviso
+pode se perder no barramento; por isso o instante usado nunca é anterior ao
+início do processo nem ao começo do período atual de ``ETAG_MAX_AGE``
+segundos. Só o ``If-None-Match`` é aceito: o ``If-Modified-Since`` tem
+resolução de um segundo e confirmaria respostas de alterações feitas no
+mesmo segundo.
+"""
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, List
+
+from flask import make_response, request
+
+from config import Config
+from message_bus import invalidation_bus
+
+
+class VersionStamps:
+    """Instante da última alteração conhecida de cada recurso, compartilhado entre os workers."""
+
+    def __init__(self):
+        self._started = time.time()
+        self._changes: Dict[str, float] = {}
+        self._listeners: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    def on_change(self, callback: Callable[[str], None]) -> None:
+        """Registra ``callback(chave)``, chamado em cada worker antes da nova versão valer.
+
+        Caches derivados do recurso devem ser descartados aqui: assim nenhum
+        worker responde com o ETag novo e o conteúdo antigo.
+        """
+        self._listeners.append(callback)
+
+    def bump(self, key: str) -> None:
+        """Marca o recurso como alterado (em todos os workers)."""
+        invalidation_bus.publish('version', key=key, at=time.time())
+
+    def apply(self, data: Dict) -> None:
+        """Registra um aviso de alteração (deste ou de outro processo)."""
+        key = data['key']
+        for callback in self._listeners:
+            callback(key)
+        with self._lock:
+            self._changes[key] = max(self._changes.get(key, 0.0), data['at'])
+            if len(self._changes) > 1024:
+                # Alterações anteriores ao período atual já estão cobertas pelo piso
+                floor = self._floor()
+                for stale in [k for k, at in self._changes.items() if at < floor]:
+                    del self._changes[stale]
+
+    def _floor(self) -> float:
+        period_start = time.time() // Config.ETAG_MAX_AGE * Config.ETAG_MAX_AGE
+        return max(self._started, period_start)
+
+    def stamp(self, key: str) -> str:
+        """ETag atual do recurso."""
+        changed = max(self._changes.get(key, 0.0), self._floor())
+        return f'{key}-{int(changed * 1000):x}'
+
+
+# Instância global dos carimbos de versão
+version_stamps = VersionStamps()
+invalidation_bus.subscribe('version', version_stamps.apply)
+
+
+def conditional_get(resource: Callable[..., str]):
+    """Decorador de rota GET: responde 304 quando o cliente já tem a versão atual.
+
+    ``resource`` recebe os argumentos da rota e retorna a chave da versão.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = version_stamps.stamp(resource(**kwargs))
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,4 +31,47 @@ class Config:
     # Server Configuration
     HOST = os.getenv('HOST', '127.0.0.1')
     PORT = int(os.getenv('PORT', 5001))
-    DEBUG = os.getenv('DEBUG', 'True') == 'True'
\ No newline at end of file
+    DEBUG = os.getenv('DEBUG', 'True') == 'True'
+    
+    # Performance Configuration
+    SLOT_INDEX_TTL = int(os.getenv('SLOT_INDEX_TTL', 300))  # segundos
+    SLOT_MINUTES = int(os.getenv('SLOT_MINUTES', 30))  # duração de cada horário
+    AVAILABILITY_MAX_DAYS = int(os.getenv('AVAILABILITY_MAX_DAYS', 30))
+    REPORT_MAX_AGE = int(os.getenv('REPORT_MAX_AGE', 600))  # segundos até recalcular o relatório
+    PAGE_SIZE = int(os.getenv('PAGE_SIZE', 50))  # itens por página nas listagens
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 200))
+    IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL', 60))  # segundos
+    IDENTITY_CACHE_SIZE = int(os.getenv('IDENTITY_CACHE_SIZE', 1024))
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))  # workers do gunicorn (mesma variável que ele lê)
+    HASH_WORKERS = int(os.getenv('HASH_WORKERS', max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)))  # por worker web: os núcleos divididos entre os workers (0 = hash no próprio processo)
+    HASH_QUEUE_SIZE = int(os.getenv('HASH_QUEUE_SIZE', 64))  # hashes simultâneos (em execução + aguardando)
+    HASH_QUEUE_TIMEOUT = float(os.getenv('HASH_QUEUE_TIMEOUT', 5))  # segundos aguardando vaga na fila
+    HASH_START_METHOD = os.getenv('HASH_START_METHOD', '')  # fork, spawn ou forkserver (vazio = padrão)
+    DB_POOL_WORKERS = int(os.getenv('DB_POOL_WORKERS', 16))  # threads do pool de consultas em paralelo (concurrent_database)
+    DB_FANOUT_LIMIT = int(os.getenv('DB_FANOUT_LIMIT', 4))  # consultas simultâneas por requisição
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 20))  # conexões HTTP simultâneas com o Supabase
+    DB_POOL_KEEPALIVE = int(os.getenv('DB_POOL_KEEPALIVE', 10))  # conexões ociosas mantidas abertas
+    DB_KEEPALIVE_EXPIRY = float(os.getenv('DB_KEEPALIVE_EXPIRY', 60))  # segundos até fechar uma conexão ociosa
+    DB_CONNECT_TIMEOUT = float(os.getenv('DB_CONNECT_TIMEOUT', 5))  # segundos
+    DB_REQUEST_TIMEOUT = float(os.getenv('DB_REQUEST_TIMEOUT', 15))  # segundos por leitura/escrita
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))  # segundos aguardando conexão livre no pool
+    DB_HTTP2 = os.getenv('DB_HTTP2', 'False') == 'True'  # requer o pacote h2
+    SESSION_USER_CACHE_TTL = int(os.getenv('SESSION_USER_CACHE_TTL', 30))  # segundos (0 = apenas por requisição)
+    SESSION_USER_CACHE_SIZE = int(os.getenv('SESSION_USER_CACHE_SIZE', 1024))
+    PROFILE_SNAPSHOT_MAX_AGE = int(os.getenv('PROFILE_SNAPSHOT_MAX_AGE', 300))  # segundos até reler o perfil da sessão
+    CHAT_MAX_MESSAGE_LENGTH = int(os.getenv('CHAT_MAX_MESSAGE_LENGTH', 2000))  # caracteres por mensagem
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE', '')  # unix:///dir (local) ou URL de broker externo; vazio = um processo
+    CHAT_TAIL_SIZE = int(os.getenv('CHAT_TAIL_SIZE', 50))  # últimas mensagens guardadas por conversa (0 = desligado)
+    CHAT_TAIL_CONVERSATIONS = int(os.getenv('CHAT_TAIL_CONVERSATIONS', 500))  # conversas ativas em cache
+    CHAT_TAIL_TTL = int(os.getenv('CHAT_TAIL_TTL', 300))  # segundos
+    AUTO_COMPLETE_INTERVAL = int(os.getenv('AUTO_COMPLETE_INTERVAL', 300))  # segundos entre passadas (0 = desligado)
+    AUTO_COMPLETE_LOCK_FILE = os.getenv('AUTO_COMPLETE_LOCK_FILE', os.path.join(tempfile.gettempdir(), 'groomly-auto-complete.lock'))
+    CATALOG_CACHE_TTL = int(os.getenv('CATALOG_CACHE_TTL', 60))  # segundos servindo o catálogo sem recarregar
+    CATALOG_STALE_TTL = int(os.getenv('CATALOG_STALE_TTL', 300))  # segundos servindo o antigo enquanto recarrega
+    ETAG_MAX_AGE = int(os.getenv('ETAG_MAX_AGE', 300))  # segundos de validade de um ETag (limita avisos de alteração perdidos entre workers)
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')  # auto (orjson se instalado), orjson ou default
+    JSON_SORT_KEYS = os.getenv('JSON_SORT_KEYS', 'False') == 'True'  # apenas com o orjson (o provider padrão sempre ordena)
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 300))  # chamadas ao banco acima disso vão para o log (0 = desligado)
+    DB_REQUEST_QUERY_BUDGET = int(os.getenv('DB_REQUEST_QUERY_BUDGET', 10))  # chamadas ao banco por requisição antes do aviso (0 = sem limite)
+    DB_REQUEST_TIME_BUDGET_MS = float(os.getenv('DB_REQUEST_TIME_BUDGET_MS', 500))  # ms somados no banco por requisição antes do aviso (0 = sem limite)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # Bearer das rotas de operação: /metrics, /api/cache/stats e relatório geral (vazio = recusadas)
@@ -1,57 +1,201 @@
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
 from config import Config
+from http_pool import get_http_client
+from query_metrics import instrument_queries
+import base64
 import json
-from typing import Dict, List, Optional, Any
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
 
+
+# Paginação por cursor (keyset em created_at, id)
+def encode_cursor(row: Dict) -> str:
+    """Gera o cursor que aponta para depois da linha informada"""
+    raw = json.dumps([row['created_at'], row['id']])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+# created_at como o Postgres devolve (timestamp ISO, com fração e fuso opcionais)
+CURSOR_TIMESTAMP = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d{1,6})?(Z|[+-]\d{2}:?\d{2})?')
+
+def decode_cursor(cursor: str) -> Tuple[str, Any]:
+    """Lê um cursor gerado por encode_cursor (ValueError se inválido).
+    
+    Os valores vão para um filtro ``or_`` do PostgREST, então só passam
+    timestamps ISO e ids inteiros ou UUID.
+    """
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(created_at, str) or not CURSOR_TIMESTAMP.fullmatch(created_at):
+            raise ValueError
+        if isinstance(row_id, str):
+            row_id = str(uuid.UUID(row_id))
+        elif isinstance(row_id, bool) or not isinstance(row_id, int):
+            raise ValueError
+    except Exception:
+        raise ValueError('Cursor inválido')
+    return created_at, row_id
+
+# Projeções de colunas por tabela; 'full' (todas as colunas) vale para todas
+PROJECTIONS = {
+    'clientes': {
+        'card': 'id,nome',
+        'auth': 'id,nome,email,senha,telefone,endereco',
+        'profile': 'id,nome,email,telefone,endereco'
+    },
+    'professionals': {
+        'card': 'id,nome,categoria,especialidades,preco_base,bio,endereco,avaliacao,total_avaliacoes',
+        'prices': 'id,nome,foto,avaliacao',
+        'auth': 'id,nome,email,senha,telefone,endereco,ativo',
+        'profile': 'id,nome,email,telefone,endereco,categoria,especialidades,preco_base,disponibilidade,bio,ativo,avaliacao,total_avaliacoes'
+    },
+    'appointments': {
+        'report': 'id,date,profissional_id,status,total_price'
+    }
+}
+
+# Contador de mensagens não lidas de cada lado da conversa
+UNREAD_COLUMNS = {
+    'client': 'cliente_unread',
+    'professional': 'profissional_unread'
+}
+
+def page_size(limit: Optional[int]) -> int:
+    """Normaliza o tamanho de página pedido pelo cliente"""
+    if not limit or limit < 1:
+        return Config.PAGE_SIZE
+    return min(limit, Config.MAX_PAGE_SIZE)
+
+def split_page(rows: List[Dict], limit: int) -> Tuple[List[Dict], Optional[str]]:
+    """Separa a página (buscada com limit + 1) e calcula o próximo cursor"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+# Métodos que não fazem chamadas ao banco ficam fora das métricas
+@instrument_queries(exclude=('get_client', 'set_client_factory', 'on_write'))
 class SupabaseDB:
     def __init__(self):
-        self.client: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
-        self.service_client: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+        # Os clientes são criados no primeiro uso de cada processo, sobre o pool HTTP compartilhado
+        self._clients: Dict[bool, Client] = {}
+        self._clients_pid: Optional[int] = None
+        self._clients_lock = threading.Lock()
+        self._client_factory: Optional[Callable[[bool], Client]] = None
+        self._listeners: Dict[str, List[Callable[[Dict], None]]] = {}
+    
+    @property
+    def client(self) -> Client:
+        return self.get_client()
+    
+    @property
+    def service_client(self) -> Client:
+        return self.get_client(use_service_key=True)
     
     def get_client(self, use_service_key: bool = False) -> Client:
         """Retorna o cliente Supabase apropriado"""
-        return self.service_client if use_service_key else self.client
+        client = self._clients.get(use_service_key) if self._clients_pid == os.getpid() else None
+        if client is None:
+            with self._clients_lock:
+                if self._clients_pid != os.getpid():
+                    self._clients = {}
+                    self._clients_pid = os.getpid()
+                client = self._clients.get(use_service_key)
+                if client is None:
+                    client = self._clients[use_service_key] = self._create_client(use_service_key)
+        return client
+    
+    def _create_client(self, use_service_key: bool) -> Client:
+        if self._client_factory:
+            return self._client_factory(use_service_key)
+        key = Config.SUPABASE_SERVICE_KEY if use_service_key else Config.SUPABASE_KEY
+        options = ClientOptions(httpx_client=get_http_client())
+        return create_client(Config.SUPABASE_URL, key, options=options)
+    
+    def set_client_factory(self, factory: Optional[Callable[[bool], Client]]) -> None:
+        """Troca a criação dos clientes (ex.: stand-in local dos benchmarks); None volta ao Supabase"""
+        with self._clients_lock:
+            self._client_factory = factory
+            self._clients = {}
+            self._clients_pid = None
+    
+    def on_write(self, table: str, callback: Callable[[Dict], None]) -> None:
+        """Registra uma função chamada com a linha gravada após cada escrita na tabela"""
+        self._listeners.setdefault(table, []).append(callback)
+    
+    def _notify(self, table: str, row: Optional[Dict]) -> Optional[Dict]:
+        """Avisa os interessados na tabela sobre a escrita e devolve a linha"""
+        if row:
+            for callback in self._listeners.get(table, ()):
+                callback(row)
+        return row
+    
+    @staticmethod
+    def _columns(table: str, projection: str) -> str:
+        """Resolve o nome da projeção para a lista de colunas do select"""
+        if projection == 'full':
+            return '*'
+        try:
+            return PROJECTIONS[table][projection]
+        except KeyError:
+            raise ValueError(f"Projeção '{projection}' não definida para a tabela {table}")
+    
+    @staticmethod
+    def _keyset(query, limit: Optional[int], cursor: Optional[str], desc: bool = True):
+        """Ordena por (created_at, id) e aplica o cursor e o limite"""
+        if cursor:
+            created_at, row_id = decode_cursor(cursor)
+            op = 'lt' if desc else 'gt'
+            query = query.or_(f'created_at.{op}."{created_at}",and(created_at.eq."{created_at}",id.{op}."{row_id}")')
+        query = query.order('created_at', desc=desc).order('id', desc=desc)
+        if limit:
+            query = query.limit(limit)
+        return query
     
     # Métodos para Clientes
     def create_client_user(self, data: Dict) -> Dict:
         """Cria um novo cliente"""
         result = self.client.table('clientes').insert(data).execute()
-        return result.data[0] if result.data else None
+        return self._notify('clientes', result.data[0] if result.data else None)
     
-    def get_client_by_email(self, email: str) -> Optional[Dict]:
+    def get_client_by_email(self, email: str, projection: str = 'full') -> Optional[Dict]:
         """Busca cliente por email"""
-        result = self.client.table('clientes').select('*').eq('email', email).execute()
+        result = self.client.table('clientes').select(self._columns('clientes', projection)).eq('email', email).execute()
         return result.data[0] if result.data else None
     
-    def get_client_by_id(self, client_id: int) -> Optional[Dict]:
+    def get_client_by_id(self, client_id: int, projection: str = 'full') -> Optional[Dict]:
         """Busca cliente por ID"""
-        result = self.client.table('clientes').select('*').eq('id', client_id).execute()
+        result = self.client.table('clientes').select(self._columns('clientes', projection)).eq('id', client_id).execute()
         return result.data[0] if result.data else None
     
     def update_client(self, client_id: int, data: Dict) -> Dict:
         """Atualiza dados do cliente"""
         result = self.client.table('clientes').update(data).eq('id', client_id).execute()
-        return result.data[0] if result.data else None
+        return self._notify('clientes', result.data[0] if result.data else None)
     
     # Métodos para Profissionais
     def create_professional(self, data: Dict) -> Dict:
         """Cria um novo profissional"""
         result = self.client.table('professionals').insert(data).execute()
-        return result.data[0] if result.data else None
+        return self._notify('professionals', result.data[0] if result.data else None)
     
-    def get_professional_by_email(self, email: str) -> Optional[Dict]:
+    def get_professional_by_email(self, email: str, projection: str = 'full') -> Optional[Dict]:
         """Busca profissional por email"""
-        result = self.client.table('professionals').select('*').eq('email', email).execute()
+        result = self.client.table('professionals').select(self._columns('professionals', projection)).eq('email', email).execute()
         return result.data[0] if result.data else None
     
-    def get_professional_by_id(self, professional_id: int) -> Optional[Dict]:
+    def get_professional_by_id(self, professional_id: int, projection: str = 'full') -> Optional[Dict]:
         """Busca profissional por ID"""
-        result = self.client.table('professionals').select('*').eq('id', professional_id).execute()
+        result = self.client.table('professionals').select(self._columns('professionals', projection)).eq('id', professional_id).execute()
         return result.data[0] if result.data else None
     
-    def get_all_professionals(self, active_only: bool = True) -> List[Dict]:
+    def get_all_professionals(self, active_only: bool = True, projection: str = 'full') -> List[Dict]:
         """Lista todos os profissionais"""
-        query = self.client.table('professionals').select('*')
+        query = self.client.table('professionals').select(self._columns('professionals', projection))
         if active_only:
             query = query.eq('ativo', True)
         result = query.execute()
@@ -60,31 +204,31 @@ class SupabaseDB:
     def update_professional(self, professional_id: int, data: Dict) -> Dict:
         """Atualiza dados do profissional"""
         result = self.client.table('professionals').update(data).eq('id', professional_id).execute()
-        return result.data[0] if result.data else None
+        return self._notify('professionals', result.data[0] if result.data else None)
     
     # Métodos para Serviços
     def create_service(self, data: Dict) -> Dict:
         """Cria um novo serviço"""
         result = self.client.table('services').insert(data).execute()
-        return result.data[0] if result.data else None
+        return self._notify('services', result.data[0] if result.data else None)
     
-    def get_all_services(self, active_only: bool = True) -> List[Dict]:
+    def get_all_services(self, active_only: bool = True, projection: str = 'full') -> List[Dict]:
         """Lista todos os serviços"""
-        query = self.client.table('services').select('*')
+        query = self.client.table('services').select(self._columns('services', projection))
         if active_only:
             query = query.eq('ativo', True)
         result = query.execute()
         return result.data or []
     
-    def get_service_by_id(self, service_id: int) -> Optional[Dict]:
+    def get_service_by_id(self, service_id: int, projection: str = 'full') -> Optional[Dict]:
         """Busca serviço por ID"""
-        result = self.client.table('services').select('*').eq('id', service_id).execute()
+        result = self.client.table('services').select(self._columns('services', projection)).eq('id', service_id).execute()
         return result.data[0] if result.data else None
     
     def update_service(self, service_id: int, data: Dict) -> Dict:
         """Atualiza dados do serviço"""
         result = self.client.table('services').update(data).eq('id', service_id).execute()
-        return result.data[0] if result.data else None
+        return self._notify('services', result.data[0] if result.data else None)
     
     # Métodos para Agendamentos
     def create_appointment(self, data: Dict) -> Dict:
@@ -92,66 +236,152 @@ class SupabaseDB:
         result = self.client.table('appointments').insert(data).execute()
         return result.data[0] if result.data else None
     
-    def get_appointment_by_id(self, appointment_id: str) -> Optional[Dict]:
+    def get_appointment_by_id(self, appointment_id: str, projection: str = 'full') -> Optional[Dict]:
         """Busca agendamento por ID"""
-        result = self.client.table('appointments').select('*').eq('id', appointment_id).execute()
+        result = self.client.table('appointments').select(self._columns('appointments', projection)).eq('id', appointment_id).execute()
         return result.data[0] if result.data else None
     
-    def get_appointments_by_client(self, client_id: int) -> List[Dict]:
-        """Lista agendamentos do cliente"""
-        result = self.client.table('appointments').select('*').eq('cliente_id', client_id).order('created_at', desc=True).execute()
+    def get_appointments_by_client(self, client_id: int, limit: Optional[int] = None, cursor: Optional[str] = None, projection: str = 'full') -> List[Dict]:
+        """Lista agendamentos do cliente (mais recentes primeiro)"""
+        query = self.client.table('appointments').select(self._columns('appointments', projection)).eq('cliente_id', client_id)
+        result = self._keyset(query, limit, cursor).execute()
         return result.data or []
     
-    def get_appointments_by_professional(self, professional_id: int) -> List[Dict]:
-        """Lista agendamentos do profissional"""
-        result = self.client.table('appointments').select('*').eq('profissional_id', professional_id).order('created_at', desc=True).execute()
+    def get_appointments_by_professional(self, professional_id: int, limit: Optional[int] = None, cursor: Optional[str] = None, projection: str = 'full') -> List[Dict]:
+        """Lista agendamentos do profissional (mais recentes primeiro)"""
+        query = self.client.table('appointments').select(self._columns('appointments', projection)).eq('profissional_id', professional_id)
+        result = self._keyset(query, limit, cursor).execute()
         return result.data or []
     
-    def get_appointments_by_date(self, date: str, professional_id: int = None) -> List[Dict]:
+    def iter_appointments_by_professional(self, professional_id: int, projection: str = 'full', batch_size: int = 500) -> Iterator[Dict]:
+        """Percorre, em páginas por cursor, todos os agendamentos do profissional (mais recentes primeiro)"""
+        cursor = None
+        while True:
+            rows = self.get_appointments_by_professional(professional_id, batch_size, cursor, projection)
+            yield from rows
+            if len(rows) < batch_size:
+                break
+            cursor = encode_cursor(rows[-1])
+    
+    def get_appointments_by_date(self, date: str, professional_id: int = None, projection: str = 'full') -> List[Dict]:
         """Lista agendamentos por data"""
-        query = self.client.table('appointments').select('*').eq('date', date)
+        query = self.client.table('appointments').select(self._columns('appointments', projection)).eq('date', date)
         if professional_id:
             query = query.eq('profissional_id', professional_id)
         result = query.execute()
         return result.data or []
     
+    def get_booked_times(self, professional_id: int, date: str) -> List[str]:
+        """Lista os horários ocupados (não cancelados) do profissional na data"""
+        result = self.client.table('appointments').select('time').eq('profissional_id', professional_id).eq('date', date).neq('status', 'cancelado').execute()
+        return [row['time'] for row in result.data or []]
+    
+    def has_appointment_at(self, professional_id: int, date: str, time: str) -> bool:
+        """Verifica se existe agendamento ativo no horário"""
+        result = self.client.table('appointments').select('id').eq('profissional_id', professional_id).eq('date', date).eq('time', time).neq('status', 'cancelado').limit(1).execute()
+        return bool(result.data)
+    
+    def get_booked_times_in_range(self, professional_id: int, start_date: str, end_date: str) -> List[Dict]:
+        """Lista data e horário dos agendamentos ativos do profissional no período"""
+        result = self.client.table('appointments').select('date,time').eq('profissional_id', professional_id).gte('date', start_date).lte('date', end_date).neq('status', 'cancelado').execute()
+        return result.data or []
+    
+    def get_appointments_in_range(self, professional_id: int, start_date: str, end_date: str, projection: str = 'full') -> List[Dict]:
+        """Lista agendamentos do profissional entre duas datas (inclusive)"""
+        result = self.client.table('appointments').select(self._columns('appointments', projection)).eq('profissional_id', professional_id).gte('date', start_date).lte('date', end_date).order('date').order('time').execute()
+        return result.data or []
+    
+    def get_appointment_summary(self, professional_id: int, start_date: str, end_date: str) -> Dict:
+        """Resume o período do profissional: receita concluída, clientes distintos e total"""
+        result = self.client.table('appointments').select('cliente_id,status,total_price').eq('profissional_id', professional_id).gte('date', start_date).lte('date', end_date).execute()
+        rows = result.data or []
+        return {
+            'revenue': sum(row.get('total_price') or 0 for row in rows if row.get('status') == 'concluido'),
+            'clients': len({row['cliente_id'] for row in rows if row.get('cliente_id') is not None}),
+            'appointments': len(rows)
+        }
+    
+    def iter_appointments_since(self, start_date: str, projection: str = 'full', batch_size: int = 1000) -> Iterator[Dict]:
+        """Percorre, em páginas, os agendamentos a partir de uma data"""
+        offset = 0
+        while True:
+            result = self.client.table('appointments').select(self._columns('appointments', projection)).gte('date', start_date).order('id').range(offset, offset + batch_size - 1).execute()
+            rows = result.data or []
+            yield from rows
+            if len(rows) < batch_size:
+                break
+            offset += batch_size
+    
     def update_appointment(self, appointment_id: str, data: Dict) -> Dict:
         """Atualiza dados do agendamento"""
         result = self.client.table('appointments').update(data).eq('id', appointment_id).execute()
         return result.data[0] if result.data else None
     
+    def complete_past_appointments(self, cutoff_date: str, cutoff_time: str) -> List[Dict]:
+        """Marca como concluídos, em uma única atualização, os agendamentos pendentes até o instante de corte"""
+        query = self.client.table('appointments').update({'status': 'concluido'}).eq('status', 'agendado')
+        query = query.or_(f'date.lt.{cutoff_date},and(date.eq.{cutoff_date},time.lte.{cutoff_time})')
+        result = query.execute()
+        return result.data or []
+    
     def delete_appointment(self, appointment_id: str) -> bool:
         """Deleta um agendamento"""
         result = self.client.table('appointments').delete().eq('id', appointment_id).execute()
         return len(result.data) > 0
     
+    # Métodos para Horários de Trabalho
+    def get_working_hours(self, professional_id: int, active_only: bool = False, projection: str = 'full') -> List[Dict]:
+        """Lista os horários de trabalho do profissional"""
+        query = self.client.table('working_hours').select(self._columns('working_hours', projection)).eq('profissional_id', professional_id)
+        if active_only:
+            query = query.eq('ativo', True)
+        result = query.order('dia_semana').execute()
+        return result.data or []
+    
+    def upsert_working_hours(self, rows: List[Dict]) -> List[Dict]:
+        """Grava vários dias da semana em um único upsert (um registro por profissional e dia)"""
+        if not rows:
+            return []
+        result = self.client.table('working_hours').upsert(rows, on_conflict='profissional_id,dia_semana').execute()
+        for row in result.data or []:
+            self._notify('working_hours', row)
+        return result.data or []
+    
     # Métodos para Preços Personalizados
-    def get_professional_prices(self, professional_id: int) -> List[Dict]:
+    def get_professional_prices(self, professional_id: int, projection: str = 'full') -> List[Dict]:
         """Lista preços personalizados do profissional"""
-        result = self.client.table('professional_prices').select('*').eq('profissional_id', professional_id).eq('ativo', True).execute()
+        result = self.client.table('professional_prices').select(self._columns('professional_prices', projection)).eq('profissional_id', professional_id).eq('ativo', True).execute()
         return result.data or []
     
-    def set_professional_price(self, professional_id: int, service_id: int, price: float, service_name: str) -> Dict:
-        """Define preço personalizado para um serviço"""
-        data = {
+    def get_all_professional_prices(self) -> List[Dict]:
+        """Lista os preços personalizados ativos de todos os profissionais"""
+        result = self.client.table('professional_prices').select('profissional_id,servico_id,servico_nome,preco').eq('ativo', True).execute()
+        return result.data or []
+    
+    def set_professional_prices(self, professional_id: int, prices: Dict[int, float], service_names: Dict[int, str]) -> Tuple[List[Dict], float]:
+        """Grava a matriz {servico_id: preço} do profissional em um único upsert
+        
+        Retorna (linhas gravadas, duração em ms).
+        """
+        rows = [{
             'profissional_id': professional_id,
             'servico_id': service_id,
-            'servico_nome': service_name,
+            'servico_nome': service_names[service_id],
             'preco': price,
             'ativo': True
-        }
+        } for service_id, price in prices.items()]
+        if not rows:
+            return [], 0.0
         
-        # Verifica se já existe
-        existing = self.client.table('professional_prices').select('*').eq('profissional_id', professional_id).eq('servico_id', service_id).execute()
-        
-        if existing.data:
-            # Atualiza existente
-            result = self.client.table('professional_prices').update({'preco': price, 'ativo': True}).eq('profissional_id', professional_id).eq('servico_id', service_id).execute()
-        else:
-            # Cria novo
-            result = self.client.table('professional_prices').insert(data).execute()
-        
-        return result.data[0] if result.data else None
+        start = time.perf_counter()
+        result = self.client.table('professional_prices').upsert(rows, on_conflict='profissional_id,servico_id').execute()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return result.data or [], elapsed_ms
+    
+    def set_professional_price(self, professional_id: int, service_id: int, price: float, service_name: str) -> Dict:
+        """Define preço personalizado para um serviço"""
+        rows, _ = self.set_professional_prices(professional_id, {service_id: price}, {service_id: service_name})
+        return rows[0] if rows else None
     
     # Métodos para Avaliações
     def create_review(self, data: Dict) -> Dict:
@@ -159,49 +389,78 @@ class SupabaseDB:
         result = self.client.table('reviews').insert(data).execute()
         return result.data[0] if result.data else None
     
-    def get_professional_reviews(self, professional_id: int) -> List[Dict]:
+    def get_professional_reviews(self, professional_id: int, projection: str = 'full') -> List[Dict]:
         """Lista avaliações do profissional"""
-        result = self.client.table('reviews').select('*').eq('profissional_id', professional_id).order('created_at', desc=True).execute()
+        result = self.client.table('reviews').select(self._columns('reviews', projection)).eq('profissional_id', professional_id).order('created_at', desc=True).execute()
         return result.data or []
     
     # Métodos para Chat
     def get_or_create_conversation(self, client_id: int, professional_id: int) -> Dict:
-        """Busca ou cria uma conversa"""
-        # Busca conversa existente
-        result = self.client.table('chat_conversations').select('*').eq('cliente_id', client_id).eq('profissional_id', professional_id).execute()
-        
-        if result.data:
-            return result.data[0]
-        
-        # Cria nova conversa
-        data = {
-            'cliente_id': client_id,
-            'profissional_id': professional_id,
-            'cliente_unread': 0,
-            'profissional_unread': 0
-        }
-        result = self.client.table('chat_conversations').insert(data).execute()
+        """Busca ou cria uma conversa (um único upsert; contadores começam em 0 pelo default da tabela)"""
+        # Em conflito só as chaves são regravadas, então os contadores existentes não mudam
+        data = {'cliente_id': client_id, 'profissional_id': professional_id}
+        result = self.client.table('chat_conversations').upsert(data, on_conflict='cliente_id,profissional_id').execute()
+        return result.data[0] if result.data else None
+    
+    def increment_unread(self, conversation_id: int, recipient_type: str) -> int:
+        """Incrementa de forma atômica as não lidas do destinatário ('client' ou 'professional')"""
+        result = self.client.rpc('chat_increment_unread', {
+            'p_conversation_id': conversation_id,
+            'p_recipient': recipient_type
+        }).execute()
+        return result.data or 0
+    
+    def reset_unread(self, conversation_id: int, reader_type: str) -> None:
+        """Zera as não lidas de quem leu a conversa ('client' ou 'professional')"""
+        column = UNREAD_COLUMNS[reader_type]
+        self.client.table('chat_conversations').update({column: 0}).eq('id', conversation_id).execute()
+    
+    def get_conversation_by_id(self, conversation_id: int) -> Optional[Dict]:
+        """Busca conversa por ID"""
+        result = self.client.table('chat_conversations').select('*').eq('id', conversation_id).execute()
         return result.data[0] if result.data else None
     
     def create_message(self, data: Dict) -> Dict:
         """Cria uma nova mensagem"""
         result = self.client.table('chat_messages').insert(data).execute()
-        return result.data[0] if result.data else None
+        return self._notify('chat_messages', result.data[0] if result.data else None)
+    
+    def get_conversation_messages(self, conversation_id: int, limit: Optional[int] = None, cursor: Optional[str] = None, projection: str = 'full') -> List[Dict]:
+        """Lista mensagens da conversa (mais antigas primeiro)"""
+        query = self.client.table('chat_messages').select(self._columns('chat_messages', projection)).eq('conversation_id', conversation_id)
+        result = self._keyset(query, limit, cursor, desc=False).execute()
+        return result.data or []
     
-    def get_conversation_messages(self, conversation_id: int) -> List[Dict]:
-        """Lista mensagens da conversa"""
-        result = self.client.table('chat_messages').select('*').eq('conversation_id', conversation_id).order('created_at', desc=False).execute()
+    def get_messages_since(self, conversation_id: int, after_id: Optional[int] = None, after: Optional[str] = None, limit: Optional[int] = None, projection: str = 'full') -> List[Dict]:
+        """Mensagens depois do último ID (ou instante created_at) visto, mais antigas primeiro"""
+        query = self.client.table('chat_messages').select(self._columns('chat_messages', projection)).eq('conversation_id', conversation_id)
+        if after_id is not None:
+            query = query.gt('id', after_id).order('id')
+        else:
+            if after:
+                query = query.gt('created_at', after)
+            query = query.order('created_at').order('id')
+        if limit:
+            query = query.limit(limit)
+        result = query.execute()
         return result.data or []
     
+    def get_latest_messages(self, conversation_id: int, limit: int, projection: str = 'full') -> List[Dict]:
+        """Últimas ``limit`` mensagens da conversa, mais antigas primeiro"""
+        query = self.client.table('chat_messages').select(self._columns('chat_messages', projection)).eq('conversation_id', conversation_id)
+        result = query.order('id', desc=True).limit(limit).execute()
+        return list(reversed(result.data or []))
+    
     # Métodos para Notificações
     def create_notification(self, data: Dict) -> Dict:
         """Cria uma nova notificação"""
         result = self.client.table('notifications').insert(data).execute()
         return result.data[0] if result.data else None
     
-    def get_user_notifications(self, user_id: int, user_type: str) -> List[Dict]:
-        """Lista notificações do usuário"""
-        result = self.client.table('notifications').select('*').eq('user_id', user_id).eq('user_type', user_type).order('created_at', desc=True).execute()
+    def get_user_notifications(self, user_id: int, user_type: str, limit: Optional[int] = None, cursor: Optional[str] = None, projection: str = 'full') -> List[Dict]:
+        """Lista notificações do usuário (mais recentes primeiro)"""
+        query = self.client.table('notifications').select(self._columns('notifications', projection)).eq('user_id', user_id).eq('user_type', user_type)
+        result = self._keyset(query, limit, cursor).execute()
         return result.data or []
     
     def mark_notification_as_read(self, notification_id: int) -> Dict:
@@ -0,0 +1,99 @@
+"""Pool de conexões HTTP compartilhado pelos clientes Supabase.
+
+Todos os clientes do processo usam o mesmo ``httpx.Client``, com limite de
+conexões, keep-alive e timeouts configurados em ``Config``. O pool é criado
+sob demanda uma vez por processo (depois do fork do worker), então as
+conexões TLS são abertas uma vez e reaproveitadas entre as requisições.
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+import httpx
+
+from config import Config
+
+_client: Optional[httpx.Client] = None
+_client_pid: Optional[int] = None
+_transport: Optional["CountingTransport"] = None
+_lock = threading.Lock()
+
+
+class CountingTransport(httpx.HTTPTransport):
+    """Transporte que conta requisições, conexões abertas e handshakes TLS."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+
+    def _trace(self, event_name: str, info: Dict) -> None:
+        if event_name == 'connection.connect_tcp.complete':
+            with self._stats_lock:
+                self.connections_opened += 1
+        elif event_name == 'connection.start_tls.complete':
+            with self._stats_lock:
+                self.tls_handshakes += 1
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions['trace'] = self._trace
+        with self._stats_lock:
+            self.requests += 1
+        return super().handle_request(request)
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de uso e reaproveitamento das conexões."""
+        with self._stats_lock:
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections_opened,
+                'tls_handshakes': self.tls_handshakes,
+                'reused': max(self.requests - self.connections_opened, 0),
+                'open_connections': len(self._pool.connections)
+            }
+
+
+def _build_client() -> httpx.Client:
+    global _transport
+    limits = httpx.Limits(
+        max_connections=Config.DB_POOL_SIZE,
+        max_keepalive_connections=Config.DB_POOL_KEEPALIVE,
+        keepalive_expiry=Config.DB_KEEPALIVE_EXPIRY
+    )
+    _transport = CountingTransport(limits=limits, http2=Config.DB_HTTP2, retries=1)
+    timeout = httpx.Timeout(Config.DB_REQUEST_TIMEOUT, connect=Config.DB_CONNECT_TIMEOUT,
+                            pool=Config.DB_POOL_TIMEOUT)
+    return httpx.Client(transport=_transport, timeout=timeout, follow_redirects=True)
+
+
+def get_http_client() -> httpx.Client:
+    """Cliente HTTP do processo atual, criado na primeira chamada."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _lock:
+        if _client is None or _client_pid != pid:
+            # Após um fork o pool herdado não é reutilizado: seus sockets são do processo pai
+            _client = _build_client()
+            _client_pid = pid
+        return _client
+
+
+def close_http_client() -> None:
+    """Fecha as conexões do processo atual (o próximo uso cria um novo pool)."""
+    global _client, _client_pid, _transport
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = _client_pid = _transport = None
+
+
+def pool_stats() -> Dict[str, int]:
+    """Estatísticas do pool do processo atual (zeros se ainda não foi criado)."""
+    transport = _transport if _client_pid == os.getpid() else None
+    if transport is None:
+        return {'requests': 0, 'connections_opened': 0, 'tls_handshakes': 0, 'reused': 0, 'open_connections': 0}
+    return transport.stats()
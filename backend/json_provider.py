@@ -0,0 +1,115 @@
+"""Serialização JSON das respostas.
+
+``install_json_provider`` troca o provider do Flask pelo ``OrjsonProvider``
+quando o pacote ``orjson`` está instalado (``JSON_PROVIDER=auto``); sem ele,
+o provider padrão continua em uso. Datas saem no mesmo formato do provider
+padrão (data HTTP), então trocar de provider não muda as respostas.
+
+``stream_json_list`` envia listas grandes em partes, codificando os itens
+conforme o gerador os produz, em vez de montar o corpo inteiro na memória.
+"""
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from flask import Flask, current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+# Itens codificados por parte enviada ao cliente
+STREAM_BATCH_SIZE = 100
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Provider JSON do Flask baseado no orjson (mesma interface do padrão)."""
+
+    def _options(self, pretty: bool = False) -> int:
+        # Datas vão para ``default`` (data HTTP, como o provider padrão), não para o ISO do orjson
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Argumentos próprios do módulo json (indent, separators...) ficam com o padrão
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options())
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty))
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json_provider(app: Flask) -> str:
+    """Instala o provider configurado em ``JSON_PROVIDER`` e retorna o nome usado."""
+    choice = Config.JSON_PROVIDER
+    if choice == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson, mas o pacote orjson não está instalado")
+    if choice in ('auto', 'orjson') and orjson is not None:
+        app.json = OrjsonProvider(app)
+        # Só o orjson deixa de ordenar as chaves; o provider padrão mantém o comportamento do Flask
+        app.json.sort_keys = Config.JSON_SORT_KEYS
+    return 'orjson' if isinstance(app.json, OrjsonProvider) else 'default'
+
+
+def _encode_item(provider, item: Any) -> bytes:
+    if isinstance(provider, OrjsonProvider):
+        return provider.dumps_bytes(item)
+    return provider.dumps(item, separators=(',', ':')).encode()
+
+
+def _stream(items: Iterable[Any], envelope: Dict[str, Any], key: str, extra) -> Iterator[bytes]:
+    provider = current_app.json
+    head = _encode_item(provider, envelope)
+    # {"success":true} -> {"success":true,"data":[
+    yield head[:-1] + (b',' if len(head) > 2 else b'') + _encode_item(provider, key) + b':['
+
+    # Cada lote é codificado como uma lista e enviado sem os colchetes
+    batch = []
+    first = True
+    for item in items:
+        batch.append(item)
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield (b'' if first else b',') + _encode_item(provider, batch)[1:-1]
+            first = False
+            batch = []
+    if batch:
+        yield (b'' if first else b',') + _encode_item(provider, batch)[1:-1]
+
+    tail = _encode_item(provider, extra() if callable(extra) else (extra or {}))
+    yield b']' + (b',' + tail[1:] if len(tail) > 2 else b'}')
+
+
+def stream_json_list(items: Iterable[Any], envelope: Optional[Dict[str, Any]] = None,
+                     key: str = 'data', extra=None, status: int = 200):
+    """Resposta JSON ``{**envelope, key: [...itens], **extra}`` enviada em partes.
+
+    ``extra`` pode ser um dict ou uma função chamada depois do último item
+    (útil para campos como ``next_cursor`` que só são conhecidos no fim).
+
+    O primeiro lote é lido antes de a resposta começar, então um erro na
+    primeira consulta ainda vira uma resposta de erro normal. Um erro em um
+    lote seguinte interrompe o corpo (JSON incompleto, que o cliente não
+    consegue interpretar): use apenas em rotas em que isso seja aceitável.
+    """
+    envelope = {'success': True} if envelope is None else envelope
+    items = iter(items)
+    first = list(islice(items, STREAM_BATCH_SIZE))
+    body = stream_with_context(_stream(chain(first, items), envelope, key, extra))
+    return current_app.response_class(body, status=status, mimetype='application/json')
@@ -0,0 +1,214 @@
+"""Barramento entre processos para o Socket.IO.
+
+Com mais de um worker, cada processo só enxerga os clientes conectados a ele.
+O ``client_manager`` do Socket.IO publica cada emissão para os outros
+processos, que a repassam aos seus clientes.
+
+``UnixSocketManager`` é o barramento local, para vários workers na mesma
+máquina e sem broker externo. Cada processo cria um socket UNIX de datagrama
+em um diretório compartilhado, e publicar é enviar a mensagem para todos os
+sockets do diretório. Para um broker externo, basta apontar
+``SOCKETIO_MESSAGE_QUEUE`` para a URL dele (redis://, amqp://, kafka://...)
+e o Flask-SocketIO usa o gerenciador correspondente.
+
+``InvalidationBus`` usa o mesmo barramento, em um canal próprio, para avisar
+os outros processos de que um dado em cache mudou (perfil, cauda do chat,
+versões de ETag).
+"""
+import json
+import os
+import socket
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import socketio
+
+# Maior datagrama aceito; mensagens de chat ficam muito abaixo disso
+MAX_DATAGRAM = 64 * 1024
+
+
+class UnixDatagramBus:
+    """Publica e recebe datagramas entre os processos que usam o mesmo diretório."""
+
+    def __init__(self, directory: str, send_timeout: float = 1.0):
+        self.directory = directory
+        self.send_timeout = send_timeout
+        self.published = 0
+        self.dropped = 0
+        self._sender: Optional[socket.socket] = None
+        self._sender_pid: Optional[int] = None
+        self._path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _own_path(self) -> str:
+        return os.path.join(self.directory, f'{os.getpid()}.sock')
+
+    def _get_sender(self) -> socket.socket:
+        with self._lock:
+            if self._sender is None or self._sender_pid != os.getpid():
+                self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self._sender.settimeout(self.send_timeout)
+                self._sender_pid = os.getpid()
+            return self._sender
+
+    def publish(self, payload: bytes) -> int:
+        """Envia o payload para os outros processos; retorna quantos receberam."""
+        try:
+            peers = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+
+        own = os.path.basename(self._own_path())
+        sender = self._get_sender()
+        delivered = 0
+        for name in peers:
+            if name == own or not name.endswith('.sock'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                sender.sendto(payload, path)
+                delivered += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Processo que terminou sem remover o socket
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError:
+                # Fila do destino cheia (timeout) ou mensagem grande demais
+                self.dropped += 1
+        self.published += 1
+        return delivered
+
+    def listen(self) -> Iterator[bytes]:
+        """Cria o socket deste processo e produz os datagramas recebidos."""
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        path = self._own_path()
+        if os.path.exists(path):
+            os.unlink(path)
+
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(path)
+        self._path = path
+        try:
+            while True:
+                yield receiver.recv(MAX_DATAGRAM)
+        finally:
+            receiver.close()
+            self.close()
+
+    def close(self) -> None:
+        """Remove o socket deste processo do diretório."""
+        if self._path and os.path.exists(self._path):
+            os.unlink(self._path)
+        self._path = None
+
+    def stats(self) -> Dict[str, int]:
+        return {'published': self.published, 'dropped': self.dropped}
+
+
+class UnixSocketManager(socketio.PubSubManager):
+    """Gerenciador do Socket.IO que usa o ``UnixDatagramBus`` entre processos.
+
+    A URL tem a forma ``unix:///caminho/do/diretorio``; cada canal usa um
+    subdiretório próprio.
+    """
+    name = 'unix'
+
+    def __init__(self, url: str = 'unix:///tmp/groomly-socketio', channel: str = 'socketio',
+                 write_only: bool = False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.bus = UnixDatagramBus(os.path.join(urlparse(url).path, channel))
+
+    def _publish(self, data):
+        return self.bus.publish(self.json.dumps(data).encode())
+
+    def _listen(self):
+        for message in self.bus.listen():
+            yield message.decode()
+
+
+def message_queue_options(url: str, channel: str = 'flask-socketio') -> Dict:
+    """Argumentos do ``SocketIO`` para o barramento configurado em ``url``.
+
+    Vazio: um único processo, sem barramento. ``unix://``: barramento local
+    entre os workers da máquina. Outras URLs vão para o Flask-SocketIO como
+    ``message_queue``.
+    """
+    if not url:
+        return {}
+    if url.startswith('unix://'):
+        return {'client_manager': UnixSocketManager(url, channel=channel)}
+    return {'message_queue': url, 'channel': channel}
+
+
+def make_pubsub_manager(url: str, channel: str) -> socketio.PubSubManager:
+    """Gerenciador de publicação/assinatura do Socket.IO para a URL do barramento."""
+    if url.startswith('unix://'):
+        return UnixSocketManager(url, channel=channel)
+    if url.startswith(('redis://', 'rediss://')):
+        return socketio.RedisManager(url, channel=channel)
+    return socketio.KombuManager(url, channel=channel)
+
+
+class InvalidationBus:
+    """Avisos de invalidação entre os processos, por tópico.
+
+    ``publish`` chama na hora os assinantes deste processo e envia o aviso
+    aos outros pelo barramento configurado; cada processo repassa os avisos
+    recebidos aos seus assinantes. Sem barramento (um único processo), só
+    os assinantes locais são chamados.
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self.published = 0
+        self.received = 0
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._manager: Optional[socketio.PubSubManager] = None
+
+    def subscribe(self, topic: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Registra ``handler(dados)`` para os avisos do tópico (deste e dos outros processos)."""
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def publish(self, topic: str, **data: Any) -> None:
+        """Avisa todos os processos, inclusive este."""
+        self._dispatch(topic, data)
+        if self._manager is not None:
+            self._manager._publish({'method': 'invalidate', 'origin': self.origin, 'topic': topic, 'data': data})
+            self.published += 1
+
+    def start(self, server, url: str, channel: str = 'groomly-invalidation') -> bool:
+        """Passa a ouvir o barramento em uma tarefa do ``server`` (thread ou greenlet)."""
+        if not url or self._manager is not None:
+            return False
+        self._manager = make_pubsub_manager(url, channel)
+        server.start_background_task(self._listen)
+        return True
+
+    def _listen(self) -> None:
+        for raw in self._manager._listen():
+            try:
+                message = raw if isinstance(raw, dict) else json.loads(raw)
+            except (TypeError, ValueError):
+                continue
+            if message.get('method') != 'invalidate' or message.get('origin') == self.origin:
+                continue
+            self.received += 1
+            self._dispatch(message.get('topic'), message.get('data') or {})
+
+    def _dispatch(self, topic: str, data: Dict[str, Any]) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(data)
+            except Exception as e:
+                print(f"Erro ao aplicar invalidação '{topic}': {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {'connected': self._manager is not None, 'published': self.published, 'received': self.received}
+
+
+# Instância global dos avisos de invalidação
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,321 @@
+"""Métricas das chamadas ao banco.
+
+``instrument_queries`` envolve os métodos do ``SupabaseDB``: cada chamada
+registra duração, linhas retornadas e erros em ``query_metrics`` (um
+histograma de latência por método). Chamadas acima de ``SLOW_QUERY_MS``
+vão para o log de consultas lentas.
+
+Dentro de uma requisição, as chamadas também somam no orçamento da
+requisição (``g.db_budget``): quantidade e tempo total no banco. Ao final,
+``install_query_budget`` adiciona o resumo no ``Server-Timing`` e avisa no
+log quando a requisição passa de ``DB_REQUEST_QUERY_BUDGET`` chamadas ou de
+``DB_REQUEST_TIME_BUDGET_MS``. Só as chamadas de primeiro nível contam no
+orçamento (um método que chama outro conta uma vez).
+
+Os números são de cada processo; com vários workers, cada um expõe os seus.
+"""
+import functools
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, g, has_app_context, has_request_context, request
+
+from config import Config
+
+# Limites dos buckets do histograma, em segundos (os padrões do Prometheus)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites do histograma de chamadas por requisição
+REQUEST_QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34)
+
+# Profundidade de chamadas instrumentadas no contexto atual (0 = fora do banco)
+_depth: ContextVar[int] = ContextVar('db_query_depth', default=0)
+
+
+class Histogram:
+    """Contagens cumulativas por bucket, soma e total (formato do Prometheus)."""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, limit in enumerate(self.buckets):
+            if value <= limit:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+class MethodStats:
+    """Histograma de latência e contadores de um método do banco."""
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.rows = 0
+        self.errors = 0
+        self.slow = 0
+        self.max_seconds = 0.0
+
+
+class QueryBudget:
+    """Chamadas ao banco e tempo somado de uma requisição."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()  # o fan-out do concurrent_db soma de várias threads
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.seconds += seconds
+
+
+class QueryMetrics:
+    """Métricas por método do banco e das requisições, neste processo."""
+
+    def __init__(self):
+        self.methods: Dict[str, MethodStats] = {}
+        self.request_queries = Histogram(REQUEST_QUERY_BUCKETS)
+        self.request_seconds = 0.0
+        self.over_budget = 0
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, seconds: float, rows: int, error: bool) -> None:
+        """Registra uma chamada; avisa no log se passou de ``SLOW_QUERY_MS``."""
+        slow = Config.SLOW_QUERY_MS > 0 and seconds * 1000 >= Config.SLOW_QUERY_MS
+        with self._lock:
+            stats = self.methods.get(method)
+            if stats is None:
+                stats = self.methods[method] = MethodStats()
+            stats.latency.observe(seconds)
+            stats.rows += rows
+            stats.errors += error
+            stats.slow += slow
+            stats.max_seconds = max(stats.max_seconds, seconds)
+        if slow:
+            where = f' em {request.method} {request.path}' if has_request_context() else ''
+            print(f"🐢 Consulta lenta: {method} {seconds * 1000:.1f} ms, {rows} linha(s){where}")
+
+    def observe_request(self, budget: QueryBudget) -> bool:
+        """Registra o total da requisição; retorna True se passou do orçamento."""
+        over = ((Config.DB_REQUEST_QUERY_BUDGET > 0 and budget.queries > Config.DB_REQUEST_QUERY_BUDGET)
+                or (Config.DB_REQUEST_TIME_BUDGET_MS > 0 and budget.seconds * 1000 > Config.DB_REQUEST_TIME_BUDGET_MS))
+        with self._lock:
+            self.request_queries.observe(budget.queries)
+            self.request_seconds += budget.seconds
+            self.over_budget += over
+        return over
+
+    def snapshot(self) -> Tuple[Dict[str, MethodStats], Histogram, float, int]:
+        """Cópia consistente (métodos, chamadas por requisição, segundos, acima do orçamento)."""
+        with self._lock:
+            methods = {}
+            for name, stats in self.methods.items():
+                copy = MethodStats()
+                copy.latency.counts = list(stats.latency.counts)
+                copy.latency.total, copy.latency.sum = stats.latency.total, stats.latency.sum
+                copy.rows, copy.errors, copy.slow, copy.max_seconds = stats.rows, stats.errors, stats.slow, stats.max_seconds
+                methods[name] = copy
+            requests = Histogram(REQUEST_QUERY_BUCKETS)
+            requests.counts = list(self.request_queries.counts)
+            requests.total, requests.sum = self.request_queries.total, self.request_queries.sum
+            return methods, requests, self.request_seconds, self.over_budget
+
+
+# Instância global das métricas do banco
+query_metrics = QueryMetrics()
+
+
+def _row_count(result) -> int:
+    """Linhas devolvidas por uma chamada ao banco (lista, linha ou (linhas, ...)).
+
+    Contagens e outros valores não são linhas devolvidas e contam como 0.
+    """
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        return 1
+    return 0
+
+
+def _finish(name: str, seconds: float, rows: int, error: bool, outermost: bool) -> None:
+    query_metrics.observe(name, seconds, rows, error)
+    if outermost and has_app_context():
+        budget = g.get('db_budget')
+        if budget is not None:
+            budget.add(seconds)
+
+
+def _timed(name: str, method):
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def generator(*args, **kwargs):
+            # Conta só o tempo dentro do gerador (as páginas buscadas), não o do consumidor
+            outermost = _depth.get() == 0
+            iterator = method(*args, **kwargs)
+            seconds, rows, error = 0.0, 0, False
+            try:
+                while True:
+                    token = _depth.set(_depth.get() + 1)
+                    start = time.perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        break
+                    finally:
+                        seconds += time.perf_counter() - start
+                        _depth.reset(token)
+                    rows += 1
+                    yield item
+            except Exception:
+                error = True
+                raise
+            finally:
+                iterator.close()
+                _finish(name, seconds, rows, error, outermost)
+        return generator
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        outermost = _depth.get() == 0
+        token = _depth.set(_depth.get() + 1)
+        start = time.perf_counter()
+        result, error = None, False
+        try:
+            result = method(*args, **kwargs)
+            return result
+        except Exception:
+            error = True
+            raise
+        finally:
+            _depth.reset(token)
+            _finish(name, time.perf_counter() - start, _row_count(result), error, outermost)
+    return wrapper
+
+
+def instrument_queries(exclude: Iterable[str] = ()):
+    """Decorador de classe: mede todos os métodos públicos, exceto os de ``exclude``."""
+    exclude = set(exclude)
+
+    def decorator(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude or not inspect.isfunction(member):
+                continue
+            setattr(cls, name, _timed(name, member))
+        return cls
+    return decorator
+
+
+def _close_budget(budget: QueryBudget, endpoint: str) -> None:
+    if query_metrics.observe_request(budget):
+        print(f"⚠️  Orçamento do banco excedido: {endpoint} "
+              f"{budget.queries} chamada(s), {budget.seconds * 1000:.1f} ms")
+
+
+def install_query_budget(app: Flask) -> None:
+    """Abre o orçamento de cada requisição e o fecha com ``Server-Timing`` e aviso no log."""
+
+    @app.before_request
+    def _open_budget():
+        g.db_budget = QueryBudget()
+
+    @app.after_request
+    def _report_budget(response):
+        budget = g.get('db_budget')
+        if budget is None:
+            return response
+        endpoint = f'{request.method} {request.path}'
+        if response.is_streamed:
+            # As consultas de respostas em partes rodam depois daqui; o total sai no fim do envio
+            response.call_on_close(lambda: _close_budget(budget, endpoint))
+            return response
+        _close_budget(budget, endpoint)
+        response.headers.add('Server-Timing', f'db-total;dur={budget.seconds * 1000:.1f};desc="{budget.queries} chamada(s)"')
+        return response
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class PrometheusText:
+    """Monta a saída no formato texto do Prometheus (versão 0.0.4)."""
+
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str, samples: Iterable[Tuple[Optional[Dict], float]]) -> None:
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {kind}')
+        for labels, value in samples:
+            self.lines.append(f'{name}{_labels(labels)} {value}')
+
+    def histogram(self, name: str, help_text: str, samples: Iterable[Tuple[Optional[Dict], Histogram]]) -> None:
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} histogram')
+        for labels, histogram in samples:
+            labels = labels or {}
+            for limit, count in zip(histogram.buckets, histogram.counts):
+                self.lines.append(f'{name}_bucket{_labels({**labels, "le": limit})} {count}')
+            self.lines.append(f'{name}_bucket{_labels({**labels, "le": "+Inf"})} {histogram.total}')
+            self.lines.append(f'{name}_sum{_labels(labels)} {histogram.sum}')
+            self.lines.append(f'{name}_count{_labels(labels)} {histogram.total}')
+
+    def stats(self, prefix: str, help_text: str, stats: Dict, counters: Iterable[str] = (),
+              label: Optional[str] = None) -> None:
+        """Uma métrica por campo numérico de um ``stats()``.
+
+        Com ``label``, ``stats`` é ``{valor do label: stats()}`` e cada campo
+        vira uma série por valor. Os campos em ``counters`` são contadores
+        (sufixo ``_total``); os demais, gauges.
+        """
+        groups = stats if label else {None: stats}
+        fields = []
+        for group in groups.values():
+            fields += [f for f, v in group.items() if isinstance(v, (int, float)) and f not in fields]
+        for field in fields:
+            counter = field in counters
+            samples = [({label: key} if label else None, int(group[field]) if isinstance(group[field], bool) else group[field])
+                       for key, group in groups.items() if isinstance(group.get(field), (int, float))]
+            self.metric(f'{prefix}_{field}_total' if counter else f'{prefix}_{field}',
+                        'counter' if counter else 'gauge', f'{help_text}: {field}', samples)
+
+    def render(self) -> str:
+        return '\n'.join(self.lines) + '\n'
+
+
+def write_query_metrics(out: PrometheusText) -> None:
+    """Adiciona as métricas do banco e das requisições na saída."""
+    methods, requests, request_seconds, over_budget = query_metrics.snapshot()
+    names = sorted(methods)
+    out.histogram('groomly_db_query_duration_seconds', 'Duração das chamadas ao banco por método',
+                  [({'method': name}, methods[name].latency) for name in names])
+    out.metric('groomly_db_query_rows_total', 'counter', 'Linhas retornadas por método',
+               [({'method': name}, methods[name].rows) for name in names])
+    out.metric('groomly_db_query_errors_total', 'counter', 'Chamadas ao banco que falharam',
+               [({'method': name}, methods[name].errors) for name in names])
+    out.metric('groomly_db_slow_queries_total', 'counter', f'Chamadas acima de {Config.SLOW_QUERY_MS:g} ms',
+               [({'method': name}, methods[name].slow) for name in names])
+    out.metric('groomly_db_query_max_seconds', 'gauge', 'Chamada mais lenta por método',
+               [({'method': name}, methods[name].max_seconds) for name in names])
+    out.histogram('groomly_db_request_queries', 'Chamadas ao banco por requisição HTTP', [(None, requests)])
+    out.metric('groomly_db_request_seconds_total', 'counter', 'Tempo somado no banco pelas requisições HTTP',
+               [(None, request_seconds)])
+    out.metric('groomly_db_request_over_budget_total', 'counter', 'Requisições acima do orçamento de chamadas ou tempo',
+               [(None, over_budget)])
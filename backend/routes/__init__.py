@@ -1,6 +1,6 @@
 """Registro das rotas (blueprints) do Corte Digital."""
 
-from . import appointments, info, barber_prices
+from . import appointments, info, barber_prices, metrics
 from .auth import register_auth_routes
 from .user import register_user_routes
 
@@ -13,3 +13,4 @@ def register_routes(app):
     app.register_blueprint(info.info_bp)
     app.register_blueprint(appointments.appointments_bp)
     app.register_blueprint(barber_prices.barber_prices_bp)
+    app.register_blueprint(metrics.metrics_bp)
@@ -1,9 +1,10 @@
 """Rotas de agendamentos."""
 from flask import Blueprint, jsonify, request
 from datetime import datetime
+from json_provider import stream_json_list
 from services import (exigir_login, list_appointments_for_user, create_appointment,
                       cancel_appointment_by_id, update_appointment_status, usuario_atual,
-                      list_appointments_for_barber)
+                      list_appointments_for_barber, is_slot_taken, auto_complete_scheduler)
 
 appointments_bp = Blueprint("appointments", __name__, url_prefix="/api/appointments")
 
@@ -32,7 +33,12 @@ def appointments_root():
         return jsonify({"success": False, "message": "Não autenticado"}), 401
 
     if request.method == "GET":
-        return jsonify({"success": True, "data": list_appointments_for_user()})
+        try:
+            data, next_cursor = list_appointments_for_user(request.args.get("limit", type=int),
+                                                           request.args.get("cursor"))
+        except ValueError as erro:
+            return jsonify({"success": False, "message": str(erro)}), 400
+        return jsonify({"success": True, "data": data, "next_cursor": next_cursor})
 
     # POST - Criar agendamento
     body = request.get_json() or {}
@@ -48,9 +54,7 @@ def appointments_root():
         return jsonify({"success": False, "message": error}), 400
 
     # Verificar conflito
-    existing = [a for a in list_appointments_for_barber(barber_id, date)
-                if a.get("time") == time and a.get("status") != "cancelado"]
-    if existing:
+    if is_slot_taken(barber_id, date, time):
         return jsonify({"success": False, "message": "Horário já agendado"}), 409
 
     # Criar agendamento
@@ -89,8 +93,8 @@ def appointments_for_barber(barber_id: int):
     if not exigir_login():
         return jsonify({"success": False, "message": "Não autenticado"}), 401
     
-    data = list_appointments_for_barber(barber_id, request.args.get('date'))
-    return jsonify({"success": True, "data": data})
+    # O histórico completo pode ser grande: é codificado e enviado em partes
+    return stream_json_list(list_appointments_for_barber(barber_id, request.args.get('date')))
 
 
 @appointments_bp.post('/auto-complete')
@@ -99,11 +103,19 @@ def auto_complete():
     if not exigir_login("barbeiro"):
         return jsonify({"success": False, "message": "Apenas barbeiros podem executar esta ação"}), 401
     
-    from services import auto_complete_past_appointments
-    updated_count = auto_complete_past_appointments()
+    updated_count = auto_complete_scheduler.run_once()
     
     return jsonify({
         "success": True, 
         "message": f"{updated_count} agendamento(s) marcado(s) como concluído(s)",
         "updated_count": updated_count
     })
+
+
+@appointments_bp.get('/auto-complete')
+def auto_complete_stats():
+    """Estatísticas das passadas de conclusão automática neste processo."""
+    if not exigir_login("barbeiro"):
+        return jsonify({"success": False, "message": "Apenas barbeiros podem executar esta ação"}), 401
+    
+    return jsonify({"success": True, "data": auto_complete_scheduler.stats()})
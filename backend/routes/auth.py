@@ -1,8 +1,10 @@
 """Rotas de autenticação - Login, Registro, etc."""
 
 from flask import Blueprint, request, jsonify, session
-from werkzeug.security import generate_password_hash, check_password_hash
 from database import db
+from services.identity_service import lookup_identity
+from services.password_service import hash_password, verify_password, HashQueueFull
+from services.profile_service import current_profile_snapshot, store_profile_snapshot
 import re
 
 auth_bp = Blueprint('auth', __name__)
@@ -65,18 +67,15 @@ def register():
                 'message': 'Telefone inválido'
             }), 400
         
-        # Verifica se email já existe
-        existing_client = db.get_client_by_email(email)
-        existing_professional = db.get_professional_by_email(email)
-        
-        if existing_client or existing_professional:
+        # Verifica se email já existe (clientes e profissionais)
+        if lookup_identity(email):
             return jsonify({
                 'success': False,
                 'message': 'Email já cadastrado'
             }), 400
         
         # Hash da senha
-        password_hash = generate_password_hash(password)
+        password_hash = hash_password(password)
         
         if user_type == 'client':
             # Registra cliente
@@ -150,6 +149,7 @@ def register():
         session['user_id'] = new_user['id']
         session['user_type'] = user_type
         session['user_name'] = name
+        store_profile_snapshot(new_user, user_type)
         
         return jsonify({
             'success': True,
@@ -162,6 +162,12 @@ def register():
             }
         }), 201
         
+    except HashQueueFull as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 503
+        
     except Exception as e:
         print(f"Erro no registro: {e}")
         return jsonify({
@@ -185,20 +191,10 @@ def login():
             }), 400
         
         # Busca usuário (cliente ou profissional)
-        user = None
-        user_type = None
+        user = lookup_identity(email)
+        user_type = user['user_type'] if user else None
         
-        client = db.get_client_by_email(email)
-        if client:
-            user = client
-            user_type = 'client'
-        else:
-            professional = db.get_professional_by_email(email)
-            if professional:
-                user = professional
-                user_type = 'professional'
-        
-        if not user or not check_password_hash(user['senha'], password):
+        if not user or not verify_password(user['senha'], password):
             return jsonify({
                 'success': False,
                 'message': 'Email ou senha incorretos'
@@ -208,6 +204,7 @@ def login():
         session['user_id'] = user['id']
         session['user_type'] = user_type
         session['user_name'] = user['nome']
+        store_profile_snapshot(user, user_type)
         
         print(f"DEBUG: Login successful. Session created: {dict(session)}")
         
@@ -223,6 +220,12 @@ def login():
             'redirect': f'/{user_type}' if user_type == 'client' else '/barbeiro'
         }), 200
         
+    except HashQueueFull as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 503
+        
     except Exception as e:
         print(f"Erro no login: {e}")
         return jsonify({
@@ -255,20 +258,25 @@ def get_current_user():
         user_id = session.get('user_id')
         user_type = session.get('user_type')
         
-        print(f"DEBUG: Session data: {dict(session)}")
-        print(f"DEBUG: user_id: {user_id}, user_type: {user_type}")
-        
         if not user_id or not user_type:
             return jsonify({
                 'success': False,
                 'message': 'Usuário não autenticado'
             }), 401
         
+        # Resumo guardado na sessão ainda válido: responde sem ir ao banco
+        snapshot = current_profile_snapshot()
+        if snapshot:
+            return jsonify({
+                'success': True,
+                'user': snapshot
+            }), 200
+        
         # Busca usuário
         if user_type == 'client':
-            user = db.get_client_by_id(user_id)
+            user = db.get_client_by_id(user_id, projection='profile')
         else:
-            user = db.get_professional_by_id(user_id)
+            user = db.get_professional_by_id(user_id, projection='profile')
         
         if not user:
             session.clear()
@@ -279,14 +287,7 @@ def get_current_user():
         
         return jsonify({
             'success': True,
-            'user': {
-                'id': user['id'],
-                'name': user['nome'],
-                'email': user['email'],
-                'type': user_type,
-                'phone': user.get('telefone'),
-                'address': user.get('endereco', '')
-            }
+            'user': store_profile_snapshot(user, user_type)
         }), 200
         
     except Exception as e:
@@ -1,10 +1,25 @@
 """Rotas para gerenciamento de preços dos barbeiros."""
+from collections import defaultdict
 from flask import Blueprint, jsonify, request, session
-from db import db, BarberPrice
-from services import exigir_login, usuario_atual
+from database import db
+from concurrent_database import concurrent_db, run_concurrently
+from services import exigir_login, list_services, usuario_atual
 
 barber_prices_bp = Blueprint("barber_prices", __name__, url_prefix="/api/barber-prices")
 
+# Preços usados quando o barbeiro ainda não definiu os seus
+DEFAULT_PRICES = {
+    "Corte": 35.00,
+    "Corte + Barba": 55.00,
+    "Barba": 25.00
+}
+
+
+def _prices_dict(prices):
+    """Converte as linhas de preço em {servico_nome: preco} (ou os preços padrão)."""
+    prices_dict = {price['servico_nome']: price['preco'] for price in prices}
+    return prices_dict or dict(DEFAULT_PRICES)
+
 
 @barber_prices_bp.get("")
 def get_barber_prices():
@@ -18,27 +33,16 @@ def get_barber_prices():
     if not barbeiro_id:
         # Buscar preços do barbeiro logado
         user = usuario_atual()
-        if user['tipo'] != 'barbeiro':
+        if not user:
+            return jsonify({"success": False, "message": "Não autenticado"}), 401
+        if user.get('tipo') != 'barbeiro':
             return jsonify({"success": False, "message": "Apenas barbeiros"}), 403
         barbeiro_id = user['id']
     
     # Buscar preços
-    prices = BarberPrice.query.filter_by(barbeiro_id=barbeiro_id).all()
-    
-    # Converter para dict
-    prices_dict = {}
-    for price in prices:
-        prices_dict[price.servico_nome] = price.preco
-    
-    # Se não houver preços, retornar preços padrão
-    if not prices_dict:
-        prices_dict = {
-            "Corte": 35.00,
-            "Corte + Barba": 55.00,
-            "Barba": 25.00
-        }
+    prices = db.get_professional_prices(barbeiro_id)
     
-    return jsonify({"success": True, "data": prices_dict})
+    return jsonify({"success": True, "data": _prices_dict(prices)})
 
 
 @barber_prices_bp.post("")
@@ -60,7 +64,7 @@ def update_barber_prices():
     body = request.get_json() or {}
     
     # Validar dados
-    servicos = ["Corte", "Corte + Barba", "Barba"]
+    servicos = list(DEFAULT_PRICES)
     precos = {}
     
     for servico in servicos:
@@ -76,26 +80,22 @@ def update_barber_prices():
         except (ValueError, TypeError):
             return jsonify({"success": False, "message": f"Preço de '{servico}' inválido"}), 400
     
-    # Atualizar ou criar preços
-    for servico, preco_novo in precos.items():
-        price_obj = BarberPrice.query.filter_by(
-            barbeiro_id=barbeiro_id,
-            servico_nome=servico
-        ).first()
-        
-        if price_obj:
-            price_obj.preco = preco_novo
-        else:
-            price_obj = BarberPrice(
-                barbeiro_id=barbeiro_id,
-                servico_nome=servico,
-                preco=preco_novo
-            )
-            db.session.add(price_obj)
-    
-    db.session.commit()
-    
-    return jsonify({"success": True, "message": "Preços atualizados com sucesso"})
+    # Mapear nomes para IDs dos serviços (catálogo em cache; a única ida ao banco é o upsert)
+    service_ids = {s['nome']: s['id'] for s in list_services()}
+    for servico in precos:
+        if servico not in service_ids:
+            return jsonify({"success": False, "message": f"Serviço '{servico}' não cadastrado"}), 400
+    
+    # Gravar a matriz inteira em um único upsert
+    rows, elapsed_ms = db.set_professional_prices(
+        barbeiro_id,
+        {service_ids[servico]: preco for servico, preco in precos.items()},
+        {service_ids[servico]: servico for servico in precos}
+    )
+    
+    response = jsonify({"success": True, "message": "Preços atualizados com sucesso", "data": _prices_dict(rows)})
+    response.headers['Server-Timing'] = f'db;dur={elapsed_ms:.1f}'
+    return response
 
 
 @barber_prices_bp.get("/all-barbers")
@@ -104,34 +104,24 @@ def get_all_barbers_prices():
     if not exigir_login():
         return jsonify({"success": False, "message": "Não autenticado"}), 401
     
-    from db import Barber
+    # Buscar todos os barbeiros e todos os preços (duas consultas, em paralelo)
+    barbeiros, prices = run_concurrently(
+        concurrent_db.get_all_professionals(projection='prices'),
+        concurrent_db.get_all_professional_prices()
+    )
     
-    # Buscar todos os barbeiros
-    barbeiros = Barber.query.all()
+    prices_by_barber = defaultdict(list)
+    for price in prices:
+        prices_by_barber[price['profissional_id']].append(price)
     
     result = []
     for barbeiro in barbeiros:
-        # Buscar preços do barbeiro
-        prices = BarberPrice.query.filter_by(barbeiro_id=barbeiro.id).all()
-        
-        prices_dict = {}
-        for price in prices:
-            prices_dict[price.servico_nome] = price.preco
-        
-        # Se não houver preços, usar padrão
-        if not prices_dict:
-            prices_dict = {
-                "Corte": 35.00,
-                "Corte + Barba": 55.00,
-                "Barba": 25.00
-            }
-        
         result.append({
-            "id": barbeiro.id,
-            "nome": barbeiro.nome,
-            "foto": barbeiro.foto,
-            "avaliacao": barbeiro.avaliacao,
-            "precos": prices_dict
+            "id": barbeiro['id'],
+            "nome": barbeiro['nome'],
+            "foto": barbeiro.get('foto'),
+            "avaliacao": barbeiro.get('avaliacao'),
+            "precos": _prices_dict(prices_by_barber.get(barbeiro['id'], ()))
         })
     
     return jsonify({"success": True, "data": result})
@@ -0,0 +1,121 @@
+"""Eventos Socket.IO do chat - salas por conversa.
+
+O cliente entra na sala da conversa com ``chat:join`` e envia com
+``chat:send``; a mensagem é gravada no banco e transmitida para a sala como
+``chat:message``. ``chat:read`` zera as não lidas de quem está com a
+conversa aberta e ``chat:sync`` traz o que chegou desde a última mensagem
+vista. As respostas (ack) seguem o formato das rotas REST:
+``{'success': bool, ...}``.
+"""
+from flask import request, session
+from flask_socketio import ConnectionRefusedError, emit, join_room, leave_room, rooms
+
+from services import conversation_room, mark_conversation_read, open_conversation, send_message, sync_messages
+
+
+def _current_user():
+    """(tipo, id) do usuário logado na sessão do Socket.IO."""
+    return session.get('user_type'), session.get('user_id')
+
+
+def _conversation_id(data):
+    try:
+        return int((data or {}).get('conversation_id'))
+    except (TypeError, ValueError):
+        return None
+
+
+def on_connect():
+    """Recusa conexões sem login."""
+    user_type, user_id = _current_user()
+    if not user_id or not user_type:
+        raise ConnectionRefusedError('Usuário não autenticado')
+
+
+def on_join(data):
+    """Entra na sala de uma conversa (por conversation_id ou pelo outro participante)."""
+    user_type, user_id = _current_user()
+    data = data or {}
+    counterpart_id = data.get('professional_id') if user_type == 'client' else data.get('client_id')
+
+    conversation = open_conversation(
+        user_type, user_id,
+        conversation_id=_conversation_id(data) if 'conversation_id' in data else None,
+        counterpart_id=counterpart_id
+    )
+    if not conversation:
+        return {'success': False, 'message': 'Conversa não encontrada'}
+
+    join_room(conversation_room(conversation['id']))
+    mark_conversation_read(conversation['id'], user_type)
+    return {'success': True, 'conversation': conversation}
+
+
+def on_read(data):
+    """Marca a conversa como lida (mensagens recebidas com a conversa aberta)."""
+    user_type, _ = _current_user()
+    conversation_id = _conversation_id(data)
+    if conversation_id is None or conversation_room(conversation_id) not in rooms(sid=request.sid):
+        return {'success': False, 'message': 'Entre na conversa antes de marcá-la como lida'}
+
+    mark_conversation_read(conversation_id, user_type)
+    return {'success': True}
+
+
+def on_leave(data):
+    """Sai da sala da conversa."""
+    conversation_id = _conversation_id(data)
+    if conversation_id is None:
+        return {'success': False, 'message': 'conversation_id obrigatório'}
+
+    leave_room(conversation_room(conversation_id))
+    return {'success': True}
+
+
+def on_send(data):
+    """Grava a mensagem e a transmite para todos na sala da conversa."""
+    user_type, user_id = _current_user()
+    conversation_id = _conversation_id(data)
+    room = conversation_room(conversation_id)
+
+    # A participação foi verificada no chat:join; estar na sala basta
+    if conversation_id is None or room not in rooms(sid=request.sid):
+        return {'success': False, 'message': 'Entre na conversa antes de enviar mensagens'}
+
+    try:
+        message = send_message(conversation_id, user_type, user_id, data.get('content'))
+    except ValueError as e:
+        return {'success': False, 'message': str(e)}
+
+    if not message:
+        return {'success': False, 'message': 'Erro ao enviar mensagem'}
+
+    emit('chat:message', message, to=room)
+    return {'success': True, 'message': message}
+
+
+def on_sync(data):
+    """Mensagens depois da última vista pelo cliente (after_id ou after), para reconexões."""
+    conversation_id = _conversation_id(data)
+    if conversation_id is None or conversation_room(conversation_id) not in rooms(sid=request.sid):
+        return {'success': False, 'message': 'Entre na conversa antes de sincronizar'}
+
+    try:
+        after_id = data.get('after_id')
+        after_id = int(after_id) if after_id is not None else None
+        limit = int(data['limit']) if data.get('limit') is not None else None
+    except (TypeError, ValueError):
+        return {'success': False, 'message': 'after_id e limit devem ser números'}
+
+    messages, has_more = sync_messages(conversation_id, after_id=after_id, after=data.get('after'), limit=limit)
+    return {'success': True, 'messages': messages, 'has_more': has_more}
+
+
+def register_chat_events(socketio):
+    """Registra os eventos de chat no servidor Socket.IO."""
+    socketio.on_event('connect', on_connect)
+    socketio.on_event('chat:join', on_join)
+    socketio.on_event('chat:leave', on_leave)
+    socketio.on_event('chat:read', on_read)
+    socketio.on_event('chat:sync', on_sync)
+    socketio.on_event('chat:send', on_send)
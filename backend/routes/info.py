@@ -1,27 +1,80 @@
 """Rotas com informações gerais (barbeiros, serviços, notificações, relatórios)."""
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, session
 
-from services import list_barbers, list_services, list_notifications, report_week
+from conditional import conditional_get
+
+from services import (exigir_login, exigir_token_metricas, list_barbers, list_services,
+                      list_notifications, report_week, rebuild_week_report)
+from services.auth_service import session_user_cache
+from services.chat_service import message_tails
+from services.identity_service import identity_cache
+from services.info_service import catalog_cache
 
 info_bp = Blueprint("info", __name__, url_prefix="/api")
 
 
 @info_bp.get("/barbers")
+@conditional_get(lambda: 'barbers')
 def listar_barbeiros():
     return jsonify({"success": True, "data": list_barbers()})
 
 
 @info_bp.get("/services")
+@conditional_get(lambda: 'services')
 def listar_servicos():
     return jsonify({"success": True, "data": list_services()})
 
 
 @info_bp.get("/notifications")
 def listar_notificacoes():
-    return jsonify({"success": True, "data": list_notifications()})
+    try:
+        data, next_cursor = list_notifications(request.args.get("limit", type=int),
+                                               request.args.get("cursor"))
+    except ValueError as erro:
+        return jsonify({"success": False, "message": str(erro)}), 400
+    return jsonify({"success": True, "data": data, "next_cursor": next_cursor})
 
 
 @info_bp.get("/reports/week")
 def relatorio_semana():
-    return jsonify({"success": True, "data": report_week()})
+    """Relatório da semana: o barbeiro logado vê apenas o seu.
+    
+    O total da barbearia (ou de outro profissional) exige o token de operação
+    (``METRICS_TOKEN``), já que não há um perfil de administrador.
+    """
+    professional_id = request.args.get("profissional_id", type=int)
+    if not exigir_token_metricas():
+        if not exigir_login("barbeiro"):
+            return jsonify({"success": False, "message": "Apenas barbeiros podem ver o relatório"}), 401
+        if professional_id not in (None, session["user_id"]):
+            return jsonify({"success": False, "message": "Acesso negado"}), 403
+        professional_id = session["user_id"]
+    return jsonify({"success": True, "data": report_week(professional_id)})
+
+
+@info_bp.post("/reports/week/rebuild")
+def recalcular_relatorio_semana():
+    """Recalcula os contadores do relatório semanal a partir da tabela de agendamentos.
+    
+    A passada lê a tabela inteira da janela; por isso é uma ação de operação (``METRICS_TOKEN``).
+    """
+    if not exigir_token_metricas():
+        return jsonify({"success": False, "message": "Não autorizado"}), 401
+    
+    total = rebuild_week_report()
+    return jsonify({"success": True, "message": f"{total} agendamento(s) processado(s)", "processed": total})
+
+
+@info_bp.get("/cache/stats")
+def estatisticas_cache():
+    """Contadores de acertos/falhas dos caches em memória deste processo."""
+    if not exigir_token_metricas():
+        return jsonify({"success": False, "message": "Não autorizado"}), 401
+    
+    return jsonify({"success": True, "data": {
+        "catalog": catalog_cache.stats(),
+        "identity": identity_cache.stats(),
+        "session_user": session_user_cache.stats(),
+        "chat_tail": message_tails.stats()
+    }})
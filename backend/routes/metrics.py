@@ -0,0 +1,40 @@
+"""Rota /metrics - métricas deste processo no formato texto do Prometheus."""
+from flask import Blueprint, Response
+
+from http_pool import pool_stats
+from message_bus import invalidation_bus
+from query_metrics import PrometheusText, write_query_metrics
+
+from services import auto_complete_scheduler, exigir_token_metricas
+from services.auth_service import session_user_cache
+from services.chat_service import message_tails
+from services.identity_service import identity_cache
+from services.info_service import catalog_cache
+from services.password_service import password_hasher
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.get("/metrics")
+def metrics():
+    """Banco (por método e por requisição), hashing, caches, pool HTTP e agendador."""
+    if not exigir_token_metricas():
+        return Response('Não autorizado\n', status=401, mimetype='text/plain')
+
+    out = PrometheusText()
+    write_query_metrics(out)
+    out.stats('groomly_password_hash', 'Pool de hashing de senhas', password_hasher.stats(),
+              counters=('completed', 'failed', 'rejected'))
+    out.stats('groomly_cache', 'Caches em memória', {
+        'catalog': catalog_cache.stats(),
+        'identity': identity_cache.stats(),
+        'session_user': session_user_cache.stats(),
+        'chat_tail': message_tails.stats()
+    }, counters=('hits', 'stale_hits', 'misses', 'refreshes', 'invalidations'), label='cache')
+    out.stats('groomly_http_pool', 'Pool HTTP do Supabase', pool_stats(),
+              counters=('requests', 'connections_opened', 'tls_handshakes', 'reused'))
+    out.stats('groomly_auto_complete', 'Conclusão automática de agendamentos', auto_complete_scheduler.stats(),
+              counters=('runs', 'errors', 'total_updated'))
+    out.stats('groomly_invalidation', 'Avisos de invalidação entre workers', invalidation_bus.stats(),
+              counters=('published', 'received'))
+    return Response(out.render(), content_type=PrometheusText.content_type)
@@ -1,7 +1,13 @@
 """Rotas para dados do usuário logado"""
 
 from flask import Blueprint, request, jsonify, session
-from db import db, Cliente, Professional, Appointment, WorkingHours
+from database import db
+from concurrent_database import concurrent_db, run_concurrently
+from conditional import conditional_get
+from services.availability_service import (DAY_NAMES, availability_queries, availability_grid,
+                                           working_hours_changes,
+                                           availability_version_key)
+from config import Config
 from datetime import datetime, timedelta
 import json
 
@@ -24,7 +30,7 @@ def get_dashboard_data():
             return get_client_dashboard_data(user_id)
         else:
             return get_professional_dashboard_data(user_id)
-            
+    
     except Exception as e:
         print(f"Erro ao buscar dados do dashboard: {e}")
         return jsonify({
@@ -34,16 +40,17 @@ def get_dashboard_data():
 
 def get_client_dashboard_data(client_id):
     """Dados do dashboard do cliente"""
-    client = Cliente.query.get(client_id)
+    # Busca o cliente e seus agendamentos em paralelo
+    client, appointments = run_concurrently(
+        concurrent_db.get_client_by_id(client_id, projection='profile'),
+        concurrent_db.get_appointments_by_client(client_id)
+    )
     if not client:
         return jsonify({
             'success': False,
             'message': 'Cliente não encontrado'
         }), 404
     
-    # Busca agendamentos do cliente
-    appointments = Appointment.query.filter_by(cliente_id=client_id).all()
-    
     # Separa agendamentos por status
     upcoming = []
     history = []
@@ -51,13 +58,12 @@ def get_client_dashboard_data(client_id):
     today = datetime.now().date()
     
     for apt in appointments:
-        apt_data = apt.to_dict()
-        apt_date = datetime.strptime(apt.date, '%Y-%m-%d').date()
+        apt_date = datetime.strptime(apt['date'], '%Y-%m-%d').date()
         
-        if apt_date >= today and apt.status in ['agendado', 'confirmado']:
-            upcoming.append(apt_data)
+        if apt_date >= today and apt['status'] in ['agendado', 'confirmado']:
+            upcoming.append(apt)
         else:
-            history.append(apt_data)
+            history.append(apt)
     
     # Ordena por data
     upcoming.sort(key=lambda x: (x['date'], x['time']))
@@ -65,12 +71,12 @@ def get_client_dashboard_data(client_id):
     
     # Estatísticas
     total_appointments = len(appointments)
-    total_spent = sum(apt.total_price or 0 for apt in appointments if apt.status == 'concluido')
+    total_spent = sum(apt.get('total_price') or 0 for apt in appointments if apt['status'] == 'concluido')
     
     return jsonify({
         'success': True,
         'data': {
-            'user': client.to_dict(),
+            'user': client,
             'upcoming_appointments': upcoming[:5],  # Próximos 5
             'recent_history': history[:5],  # Últimos 5
             'stats': {
@@ -83,63 +89,46 @@ def get_client_dashboard_data(client_id):
 
 def get_professional_dashboard_data(professional_id):
     """Dados do dashboard do profissional"""
-    professional = Professional.query.get(professional_id)
+    # Data de hoje e limites do mês atual
+    today = datetime.now().date()
+    today_str = today.strftime('%Y-%m-%d')
+    month_start = today.replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    
+    # Perfil, agendamentos de hoje e resumo do mês (receita e clientes únicos) em paralelo
+    professional, today_appointments, month_summary = run_concurrently(
+        concurrent_db.get_professional_by_id(professional_id, projection='profile'),
+        concurrent_db.get_appointments_in_range(professional_id, today_str, today_str),
+        concurrent_db.get_appointment_summary(professional_id, month_start.isoformat(), month_end.isoformat())
+    )
     if not professional:
         return jsonify({
             'success': False,
             'message': 'Profissional não encontrado'
         }), 404
     
-    # Busca agendamentos do profissional
-    appointments = Appointment.query.filter_by(profissional_id=professional_id).all()
-    
-    # Data de hoje
-    today = datetime.now().date()
-    today_str = today.strftime('%Y-%m-%d')
-    
-    # Agendamentos de hoje
-    today_appointments = [
-        apt.to_dict() for apt in appointments 
-        if apt.date == today_str
-    ]
-    today_appointments.sort(key=lambda x: x['time'])
-    
-    # Estatísticas do mês atual
-    month_start = today.replace(day=1)
-    month_appointments = [
-        apt for apt in appointments 
-        if datetime.strptime(apt.date, '%Y-%m-%d').date() >= month_start
-    ]
-    
-    # Receita do mês
-    month_revenue = sum(
-        apt.total_price or 0 
-        for apt in month_appointments 
-        if apt.status == 'concluido'
-    )
+    month_revenue = month_summary['revenue']
+    month_clients = month_summary['clients']
     
     # Receita de hoje
     today_revenue = sum(
-        apt.total_price or 0 
-        for apt in appointments 
-        if apt.date == today_str and apt.status == 'concluido'
+        apt.get('total_price') or 0
+        for apt in today_appointments
+        if apt['status'] == 'concluido'
     )
     
-    # Clientes únicos do mês
-    month_clients = len(set(apt.cliente_id for apt in month_appointments))
-    
     return jsonify({
         'success': True,
         'data': {
-            'user': professional.to_dict(),
+            'user': professional,
             'today_appointments': today_appointments,
             'stats': {
                 'today_revenue': today_revenue,
                 'month_revenue': month_revenue,
                 'today_clients': len(today_appointments),
                 'month_clients': month_clients,
-                'rating': professional.avaliacao,
-                'total_reviews': professional.total_avaliacoes
+                'rating': professional.get('avaliacao'),
+                'total_reviews': professional.get('total_avaliacoes')
             }
         }
     }), 200
@@ -162,13 +151,13 @@ def get_working_hours():
                 'message': 'Acesso não autorizado'
             }), 401
         
-        hours = WorkingHours.query.filter_by(profissional_id=user_id).all()
+        hours = db.get_working_hours(user_id, active_only=True)
         
         return jsonify({
             'success': True,
-            'data': [h.to_dict() for h in hours]
+            'data': hours
         }), 200
-        
+    
     except Exception as e:
         print(f"Erro ao buscar horários: {e}")
         return jsonify({
@@ -194,43 +183,32 @@ def save_professional_setup():
         specialty = data.get('specialty')
         working_hours = data.get('workingHours', {})
         
-        # Atualiza a especialidade do profissional
-        professional = Professional.query.get(user_id)
+        # Busca o profissional e os horários gravados em paralelo
+        professional, stored_hours = run_concurrently(
+            concurrent_db.get_professional_by_id(user_id, projection='card'),
+            concurrent_db.get_working_hours(user_id)
+        )
         if not professional:
             return jsonify({
                 'success': False,
                 'message': 'Profissional não encontrado'
             }), 404
         
-        if specialty:
-            professional.categoria = specialty
-        
-        # Remove horários antigos
-        WorkingHours.query.filter_by(profissional_id=user_id).delete()
-        
-        # Adiciona novos horários
-        for day_id, hours in working_hours.items():
-            if hours.get('enabled'):
-                new_hours = WorkingHours(
-                    profissional_id=user_id,
-                    dia_semana=int(day_id),
-                    hora_inicio=hours.get('startTime', '09:00'),
-                    hora_fim=hours.get('endTime', '18:00'),
-                    intervalo_inicio=hours.get('breakStart') or None,
-                    intervalo_fim=hours.get('breakEnd') or None,
-                    ativo=True
-                )
-                db.session.add(new_hours)
+        # Atualiza a especialidade do profissional
+        if specialty and specialty != professional.get('categoria'):
+            db.update_professional(user_id, {'categoria': specialty})
         
-        db.session.commit()
+        # Grava apenas os dias alterados, em uma única escrita
+        changes = working_hours_changes(user_id, stored_hours, working_hours)
+        db.upsert_working_hours(changes)
         
         return jsonify({
             'success': True,
-            'message': 'Configurações salvas com sucesso'
+            'message': 'Configurações salvas com sucesso',
+            'changed_days': [row['dia_semana'] for row in changes]
         }), 200
-        
+    
     except Exception as e:
-        db.session.rollback()
         print(f"Erro ao salvar configurações: {e}")
         return jsonify({
             'success': False,
@@ -238,50 +216,97 @@ def save_professional_setup():
         }), 500
 
 
+def _professional_summary(professional):
+    """Resumo público do profissional para as telas de agendamento"""
+    return {
+        'id': professional['id'],
+        'name': professional['nome'],
+        'specialty': professional.get('categoria'),
+        'rating': professional.get('avaliacao')
+    }
+
+
 @user_bp.route('/api/professionals/<int:professional_id>/availability', methods=['GET'])
+@conditional_get(lambda professional_id: availability_version_key(professional_id))
 def get_professional_availability(professional_id):
     """Retorna a disponibilidade de um profissional para os clientes"""
     try:
-        professional = Professional.query.get(professional_id)
+        professional, hours = run_concurrently(
+            concurrent_db.get_professional_by_id(professional_id, projection='card'),
+            concurrent_db.get_working_hours(professional_id, active_only=True)
+        )
         if not professional:
             return jsonify({
                 'success': False,
                 'message': 'Profissional não encontrado'
             }), 404
         
-        hours = WorkingHours.query.filter_by(
-            profissional_id=professional_id,
-            ativo=True
-        ).all()
-        
         # Formata os horários para o cliente
         availability = {}
         for h in hours:
-            day_name = ['Domingo', 'Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado'][h.dia_semana]
-            availability[h.dia_semana] = {
-                'day': day_name,
-                'startTime': h.hora_inicio,
-                'endTime': h.hora_fim,
-                'breakStart': h.intervalo_inicio,
-                'breakEnd': h.intervalo_fim
+            availability[h['dia_semana']] = {
+                'day': DAY_NAMES[h['dia_semana']],
+                'startTime': h['hora_inicio'],
+                'endTime': h['hora_fim'],
+                'breakStart': h.get('intervalo_inicio'),
+                'breakEnd': h.get('intervalo_fim')
             }
         
         return jsonify({
             'success': True,
             'data': {
-                'professional': {
-                    'id': professional.id,
-                    'name': professional.nome,
-                    'specialty': professional.categoria,
-                    'rating': professional.avaliacao
-                },
+                'professional': _professional_summary(professional),
                 'availability': availability
             }
         }), 200
-        
+    
     except Exception as e:
         print(f"Erro ao buscar disponibilidade: {e}")
         return jsonify({
             'success': False,
             'message': 'Erro interno do servidor'
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@user_bp.route('/api/professionals/<int:professional_id>/availability/slots', methods=['GET'])
+def get_professional_free_slots(professional_id):
+    """Retorna os horários livres do profissional para vários dias de uma vez"""
+    try:
+        start = request.args.get('start')
+        try:
+            start_date = datetime.strptime(start, '%Y-%m-%d').date() if start else datetime.now().date()
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'Data inicial inválida'
+            }), 400
+        
+        days = request.args.get('days', 7, type=int)
+        days = max(1, min(days, Config.AVAILABILITY_MAX_DAYS))
+        
+        # Profissional, horários de trabalho e agendamentos do período em paralelo
+        professional, working_hours, booked = run_concurrently(
+            concurrent_db.get_professional_by_id(professional_id, projection='card'),
+            *availability_queries(professional_id, start_date, days)
+        )
+        if not professional:
+            return jsonify({
+                'success': False,
+                'message': 'Profissional não encontrado'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'professional': _professional_summary(professional),
+                'slot_minutes': Config.SLOT_MINUTES,
+                'days': availability_grid(start_date, days, working_hours, booked)
+            }
+        }), 200
+    
+    except Exception as e:
+        print(f"Erro ao calcular horários livres: {e}")
+        return jsonify({
+            'success': False,
+            'message': 'Erro interno do servidor'
+        }), 500
@@ -5,6 +5,7 @@ from .auth_service import (
     authenticate_user,
     register_user,
     exigir_login,
+    exigir_token_metricas,
     usuario_atual
 )
 
@@ -12,9 +13,11 @@ from .auth_service import (
 from .appointment_service import (
     list_appointments_for_user,
     list_appointments_for_barber,
+    is_slot_taken,
     create_appointment,
     cancel_appointment_by_id,
-    update_appointment_status
+    update_appointment_status,
+    auto_complete_past_appointments
 )
 
 # Serviços de informações
@@ -25,19 +28,44 @@ from .info_service import (
     report_week
 )
 
+# Serviços de relatórios
+from .report_service import rebuild_week_report
+
+# Agendador em segundo plano
+from .scheduler import auto_complete_scheduler
+
+# Serviços de chat
+from .chat_service import (
+    conversation_room,
+    open_conversation,
+    send_message,
+    mark_conversation_read,
+    sync_messages
+)
+
 
 __all__ = [
     'authenticate_user',
     'register_user',
     'exigir_login',
+    'exigir_token_metricas',
     'usuario_atual',
     'list_appointments_for_user',
     'list_appointments_for_barber',
+    'is_slot_taken',
     'create_appointment',
     'cancel_appointment_by_id',
     'update_appointment_status',
+    'auto_complete_past_appointments',
+    'auto_complete_scheduler',
     'list_barbers',
     'list_services',
     'list_notifications',
-    'report_week'
+    'report_week',
+    'rebuild_week_report',
+    'conversation_room',
+    'open_conversation',
+    'send_message',
+    'mark_conversation_read',
+    'sync_messages'
 ]
@@ -1,45 +1,75 @@
 """Serviço de gerenciamento de agendamentos."""
 from flask import session
-from database import db
-from datetime import datetime
+from config import Config
+from database import db, page_size, split_page
+from datetime import datetime, timedelta
 import uuid
 
+from .auth_service import tipo_sessao, usuario_atual
+from .report_service import record_appointment, record_appointments
+from .slot_index import slot_index
 
-def list_appointments_for_user():
-    """Lista agendamentos do usuário atual."""
-    email = session.get("usuario_email")
-    tipo = session.get("usuario_tipo")
-    user_id = session.get("usuario_id")
+
+def list_appointments_for_user(limit=None, cursor=None):
+    """Lista uma página de agendamentos do usuário atual.
+    
+    Retorna (agendamentos, próximo_cursor); o cursor é None na última página.
+    """
+    tipo = tipo_sessao()
+    user_id = session.get("user_id")
+    limit = page_size(limit)
     
     if tipo == "barbeiro":
         # Barbeiro vê seus próprios agendamentos
-        appointments = db.get_appointments_by_professional(user_id)
+        appointments = db.get_appointments_by_professional(user_id, limit + 1, cursor)
     else:
         # Cliente vê seus agendamentos
-        appointments = db.get_appointments_by_client(user_id)
+        appointments = db.get_appointments_by_client(user_id, limit + 1, cursor)
     
-    return appointments
+    return split_page(appointments, limit)
 
 
 def list_appointments_for_barber(barber_id, date=None):
-    """Lista agendamentos de um barbeiro específico."""
+    """Iterador dos agendamentos de um barbeiro específico.
+    
+    Sem data, o histórico é buscado em páginas conforme é percorrido.
+    """
     if date:
-        appointments = db.get_appointments_by_date(date, barber_id)
-    else:
-        appointments = db.get_appointments_by_professional(barber_id)
+        return iter(db.get_appointments_by_date(date, barber_id))
+    return db.iter_appointments_by_professional(barber_id)
+
+
+def is_slot_taken(barber_id, date, time):
+    """Verifica se o horário do barbeiro já está ocupado."""
+    booked = slot_index.is_booked(barber_id, date, time)
+    if booked is None:
+        # Primeira consulta da data: carrega apenas os horários ocupados
+        slot_index.load(barber_id, date, db.get_booked_times(barber_id, date))
+        return slot_index.is_booked(barber_id, date, time)
     
-    return appointments
+    # Confirma no banco: outro processo pode ter reservado ou cancelado o horário
+    taken = db.has_appointment_at(barber_id, date, time)
+    if taken != booked:
+        slot_index.mark(barber_id, date, time, taken)
+    return taken
+
+
+def _sync_slot_index(appointment):
+    """Reflete no índice de ocupação o estado atual do agendamento."""
+    slot_index.mark(appointment['profissional_id'], appointment['date'],
+                    appointment['time'], appointment.get('status') != "cancelado")
 
 
 def create_appointment(data):
     """Cria um novo agendamento."""
     appointment_id = str(uuid.uuid4())
+    cliente = usuario_atual() or {}
     
     appointment_data = {
         'id': appointment_id,
-        'cliente': session.get("usuario_nome"),
-        'cliente_email': session.get("usuario_email"),
-        'cliente_id': session.get("usuario_id"),
+        'cliente': cliente.get("nome") or session.get("user_name"),
+        'cliente_email': cliente.get("email"),
+        'cliente_id': session.get("user_id"),
         'profissional': data.get("barberName"),
         'profissional_id': data.get("barberId"),
         'servico': data.get("serviceName"),
@@ -51,17 +81,47 @@ def create_appointment(data):
         'created_at': datetime.utcnow().isoformat()
     }
     
-    result = db.create_appointment(appointment_data)
+    # O bit do horário só é ligado com a linha confirmada pelo banco; se a
+    # gravação falhar, a data sai do índice e a próxima verificação recarrega
+    try:
+        result = db.create_appointment(appointment_data)
+    except Exception:
+        slot_index.discard(appointment_data['profissional_id'], appointment_data['date'])
+        raise
+    if not result:
+        slot_index.discard(appointment_data['profissional_id'], appointment_data['date'])
+        return None
+    
+    _sync_slot_index(result)
+    record_appointment(result, created=True)
     return result
 
 
 def cancel_appointment_by_id(appointment_id):
     """Cancela um agendamento."""
     result = db.update_appointment(appointment_id, {'status': 'cancelado'})
+    if result:
+        _sync_slot_index(result)
+        record_appointment(result)
     return result is not None
 
 
 def update_appointment_status(appointment_id, status):
     """Atualiza o status de um agendamento."""
     result = db.update_appointment(appointment_id, {'status': status})
+    if result:
+        _sync_slot_index(result)
+        record_appointment(result)
     return result is not None
+
+
+def auto_complete_past_appointments(now=None):
+    """Conclui os agendamentos pendentes que já terminaram e retorna quantos foram alterados.
+    
+    Um agendamento termina ``SLOT_MINUTES`` depois do horário marcado; a
+    alteração é uma única atualização filtrada por data/hora no banco.
+    """
+    cutoff = (now or datetime.now()) - timedelta(minutes=Config.SLOT_MINUTES)
+    updated = db.complete_past_appointments(cutoff.strftime('%Y-%m-%d'), cutoff.strftime('%H:%M'))
+    record_appointments(updated)
+    return len(updated)
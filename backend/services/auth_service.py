@@ -1,33 +1,34 @@
 """Serviço de autenticação e autorização."""
-from flask import session
+from flask import g, request, session
+from cache import TTLCache
+from config import Config
 from database import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from message_bus import invalidation_bus
+import hmac
 import json
 
+from .identity_service import lookup_identity
+from .password_service import hash_password, verify_password
+
 
 def authenticate_user(email, password):
     """Autentica um usuário (cliente ou profissional)."""
-    # Tentar como cliente
-    cliente = db.get_client_by_email(email)
-    if cliente and check_password_hash(cliente['senha'], password):
-        return {**cliente, "tipo": "cliente"}
-    
-    # Tentar como profissional
-    profissional = db.get_professional_by_email(email)
-    if profissional and check_password_hash(profissional['senha'], password):
-        # Retornar como 'barbeiro' para compatibilidade com o frontend
-        return {**profissional, "tipo": "barbeiro"}
+    identity = lookup_identity(email)
+    if not identity or not verify_password(identity['senha'], password):
+        return None
     
-    return None
+    # Profissional retorna como 'barbeiro' para compatibilidade com o frontend
+    tipo = "cliente" if identity['user_type'] == 'client' else "barbeiro"
+    return {**identity, "tipo": tipo}
 
 
 def register_user(nome, email, password, tipo="cliente", telefone=None, categoria=None, servicos=None):
     """Registra um novo usuário."""
     # Verificar se email já existe
-    if db.get_client_by_email(email) or db.get_professional_by_email(email):
+    if lookup_identity(email):
         return False
     
-    senha_hash = generate_password_hash(password)
+    senha_hash = hash_password(password)
     
     if tipo in ["barbeiro", "profissional"]:
         # Criar profissional
@@ -58,28 +59,88 @@ def register_user(nome, email, password, tipo="cliente", telefone=None, categori
     return result is not None
 
 
+# Tipo gravado na sessão pelas rotas de auth ('client'/'professional') -> tipo usado nos serviços
+TIPOS_SESSAO = {'client': 'cliente', 'professional': 'barbeiro'}
+
+
+def tipo_sessao():
+    """Tipo do usuário logado ('cliente' ou 'barbeiro'), ou None sem login."""
+    return TIPOS_SESSAO.get(session.get("user_type"))
+
+
 def exigir_login(tipo_requerido=None):
     """Verifica se o usuário está logado. Opcionalmente verifica o tipo."""
-    if "usuario_email" not in session:
+    if not session.get("user_id") or not tipo_sessao():
         return False
     
-    if tipo_requerido and session.get("usuario_tipo") != tipo_requerido:
+    if tipo_requerido and tipo_sessao() != tipo_requerido:
         return False
     
     return True
 
 
+def exigir_token_metricas():
+    """Verifica o ``Authorization: Bearer <METRICS_TOKEN>`` das rotas de diagnóstico.
+    
+    Sem ``METRICS_TOKEN`` configurado, nenhuma requisição é aceita.
+    """
+    if not Config.METRICS_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {Config.METRICS_TOKEN}')
+
+
+# Usuário da sessão entre requisições, por (user_type, id); TTL curto e invalidado nas escritas
+session_user_cache = TTLCache(maxsize=Config.SESSION_USER_CACHE_SIZE, ttl=Config.SESSION_USER_CACHE_TTL)
+
+
+def _cache_key(user_type, user_id):
+    """Chave do ``session_user_cache``, a mesma na leitura e na invalidação."""
+    return user_type, int(user_id)
+
+
+def _load_user(user_type, user_id):
+    if user_type == "professional":
+        user = db.get_professional_by_id(user_id, projection='profile')
+    else:
+        user = db.get_client_by_id(user_id, projection='profile')
+    return {**user, "tipo": TIPOS_SESSAO[user_type]} if user else None
+
+
 def usuario_atual():
-    """Retorna os dados do usuário atual da sessão."""
+    """Retorna os dados do usuário atual da sessão.
+
+    O usuário é buscado no máximo uma vez por requisição (fica em ``g``) e,
+    entre requisições, é reaproveitado do ``session_user_cache``.
+    """
     if not exigir_login():
         return None
     
-    email = session.get("usuario_email")
-    tipo = session.get("usuario_tipo")
+    if "usuario_atual" in g:
+        return g.usuario_atual
     
-    if tipo == "barbeiro":
-        user = db.get_professional_by_email(email)
-    else:
-        user = db.get_client_by_email(email)
+    key = _cache_key(session["user_type"], session["user_id"])
+    user = session_user_cache.get(key)
+    if user is None:
+        user = _load_user(*key)
+        if user and Config.SESSION_USER_CACHE_TTL > 0:
+            session_user_cache.set(key, user)
     
-    return user if user else None
+    g.usuario_atual = dict(user) if user else None
+    return g.usuario_atual
+
+
+def _on_user_write(user_type):
+    def callback(row):
+        if row.get('id') is not None:
+            invalidation_bus.publish('session_user', user_type=user_type, user_id=row['id'])
+    return callback
+
+
+def _apply_user_change(data):
+    session_user_cache.discard(_cache_key(data['user_type'], data['user_id']))
+
+
+# Atualizações de perfil invalidam o usuário guardado (em todos os workers)
+db.on_write('clientes', _on_user_write('client'))
+db.on_write('professionals', _on_user_write('professional'))
+invalidation_bus.subscribe('session_user', _apply_user_change)
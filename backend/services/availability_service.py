@@ -0,0 +1,155 @@
+"""Serviço de disponibilidade - horários livres dos profissionais.
+
+Cada dia é representado como um bitmap de minutos: o expediente liga os bits
+de ``hora_inicio`` a ``hora_fim``, e o intervalo e os agendamentos desligam os
+seus trechos. Um horário está livre quando todos os bits da sua janela
+continuam ligados, então o cálculo é feito com operações bit a bit em vez de
+comparar intervalos um a um.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from concurrent_database import concurrent_db
+from conditional import version_stamps
+from config import Config
+from database import db
+
+from .slot_index import minute_of_day
+
+DAY_NAMES = ['Domingo', 'Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado']
+
+# Campos de working_hours que definem o expediente de um dia
+SCHEDULE_FIELDS = ('hora_inicio', 'hora_fim', 'intervalo_inicio', 'intervalo_fim', 'ativo')
+
+
+def weekday_of(day):
+    """Dia da semana no formato do banco (0 = Domingo)."""
+    return (day.weekday() + 1) % 7
+
+
+def _span(start, end):
+    """Bitmap com os minutos [start, end) ligados."""
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def working_mask(hours):
+    """Bitmap do expediente de um dia, já sem o intervalo."""
+    mask = _span(minute_of_day(hours['hora_inicio']), minute_of_day(hours['hora_fim']))
+    if hours.get('intervalo_inicio') and hours.get('intervalo_fim'):
+        mask &= ~_span(minute_of_day(hours['intervalo_inicio']), minute_of_day(hours['intervalo_fim']))
+    return mask
+
+
+def working_hours_changes(professional_id, stored, submitted):
+    """Compara o horário enviado ({dia: {...}}) com o gravado e retorna só os dias alterados.
+    
+    Dias desabilitados (ou ausentes) que estavam ativos viram ``ativo=False``.
+    """
+    stored_by_day = {row['dia_semana']: row for row in stored}
+    changes = []
+    for weekday in range(7):
+        hours = submitted.get(str(weekday)) or submitted.get(weekday) or {}
+        current = stored_by_day.get(weekday)
+        if hours.get('enabled'):
+            row = {
+                'hora_inicio': hours.get('startTime', '09:00'),
+                'hora_fim': hours.get('endTime', '18:00'),
+                'intervalo_inicio': hours.get('breakStart') or None,
+                'intervalo_fim': hours.get('breakEnd') or None,
+                'ativo': True
+            }
+        elif current and current.get('ativo'):
+            row = {field: current.get(field) for field in SCHEDULE_FIELDS}
+            row['ativo'] = False
+        else:
+            continue
+        
+        if current and all(_same_time(current.get(f), row[f]) for f in SCHEDULE_FIELDS):
+            continue
+        changes.append({'profissional_id': professional_id, 'dia_semana': weekday, **row})
+    return changes
+
+
+def _same_time(stored, submitted):
+    """Compara valores do banco ('09:00:00') com os do formulário ('09:00')."""
+    if isinstance(stored, str) and isinstance(submitted, str):
+        return stored[:5] == submitted[:5]
+    return stored == submitted
+
+
+def free_slots(hours, booked_times, slot_minutes=None, not_before=None):
+    """Lista os horários livres ('HH:MM') de um dia de trabalho."""
+    slot_minutes = slot_minutes or Config.SLOT_MINUTES
+    free = working_mask(hours)
+    for time_str in booked_times:
+        start = minute_of_day(time_str)
+        free &= ~_span(start, start + slot_minutes)
+
+    opening = minute_of_day(hours['hora_inicio'])
+    closing = minute_of_day(hours['hora_fim'])
+    window = (1 << slot_minutes) - 1
+    slots = []
+    for start in range(opening, closing - slot_minutes + 1, slot_minutes):
+        if not_before is not None and start <= not_before:
+            continue
+        if free >> start & window == window:
+            slots.append(f"{start // 60:02d}:{start % 60:02d}")
+    return slots
+
+
+def availability_queries(professional_id, start_date, days):
+    """Consultas necessárias para a grade: horários de trabalho e agendamentos do período.
+    
+    Retorna chamadas adiadas, para a rota executá-las em paralelo junto com as suas.
+    """
+    end_date = start_date + timedelta(days=days - 1)
+    return (
+        concurrent_db.get_working_hours(professional_id, active_only=True),
+        concurrent_db.get_booked_times_in_range(professional_id, start_date.isoformat(), end_date.isoformat())
+    )
+
+
+def availability_grid(start_date, days, working_hours, booked):
+    """Calcula a grade de horários livres a partir dos dados já carregados."""
+    hours_by_weekday = {h['dia_semana']: h for h in working_hours}
+
+    booked_by_date = defaultdict(list)
+    for row in booked:
+        booked_by_date[row['date']].append(row['time'])
+
+    now = datetime.now()
+    grid = []
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        weekday = weekday_of(day)
+        hours = hours_by_weekday.get(weekday)
+        slots = []
+        if hours and day >= now.date():
+            not_before = now.hour * 60 + now.minute if day == now.date() else None
+            slots = free_slots(hours, booked_by_date.get(day.isoformat(), ()), not_before=not_before)
+        grid.append({
+            'date': day.isoformat(),
+            'weekday': weekday,
+            'day': DAY_NAMES[weekday],
+            'slots': slots
+        })
+    return grid
+
+
+def availability_version_key(professional_id):
+    """Chave da versão da disponibilidade do profissional (ETag da rota)."""
+    return f'availability-{professional_id}'
+
+
+def _on_schedule_write(id_field):
+    def callback(row):
+        if row.get(id_field) is not None:
+            version_stamps.bump(availability_version_key(row[id_field]))
+    return callback
+
+
+# Mudanças de horário ou do perfil do profissional alteram a disponibilidade publicada
+db.on_write('working_hours', _on_schedule_write('profissional_id'))
+db.on_write('professionals', _on_schedule_write('id'))
@@ -0,0 +1,163 @@
+"""Serviço de chat - conversas entre cliente e profissional.
+
+Para reconexões, ``sync_messages`` devolve só as mensagens depois da última
+vista. As últimas mensagens de cada conversa ativa ficam em memória (tail),
+então a maioria das sincronizações não vai ao banco. Cada mensagem gravada
+entra no tail do processo que a gravou e é avisada aos outros workers pelo
+``invalidation_bus``, que descartam o tail da conversa (é relido na próxima
+sincronização).
+"""
+import threading
+from collections import deque
+
+from cache import TTLCache
+from config import Config
+from database import db, page_size
+from message_bus import invalidation_bus
+
+# conversation_id -> {'messages': deque, 'complete': histórico inteiro cabe no tail}
+message_tails = TTLCache(maxsize=Config.CHAT_TAIL_CONVERSATIONS, ttl=Config.CHAT_TAIL_TTL)
+# conversation_id -> leituras do banco em andamento ({'stale': bool} cada);
+# a entrada sai quando a leitura termina
+_pending_loads = {}
+_tail_lock = threading.Lock()
+
+
+def conversation_room(conversation_id):
+    """Nome da sala Socket.IO da conversa."""
+    return f"conversation:{conversation_id}"
+
+
+def is_participant(conversation, user_type, user_id):
+    """Verifica se o usuário ('client' ou 'professional') participa da conversa."""
+    if not conversation:
+        return False
+    key = 'cliente_id' if user_type == 'client' else 'profissional_id'
+    return conversation.get(key) == user_id
+
+
+def open_conversation(user_type, user_id, conversation_id=None, counterpart_id=None):
+    """Retorna a conversa do usuário pelo ID ou pelo outro participante (criando se preciso).
+    
+    Retorna None se a conversa não existir ou o usuário não participar dela.
+    """
+    if conversation_id is not None:
+        conversation = db.get_conversation_by_id(conversation_id)
+    elif counterpart_id is not None:
+        if user_type == 'client':
+            conversation = db.get_or_create_conversation(user_id, counterpart_id)
+        else:
+            conversation = db.get_or_create_conversation(counterpart_id, user_id)
+    else:
+        return None
+    
+    return conversation if is_participant(conversation, user_type, user_id) else None
+
+
+def send_message(conversation_id, user_type, user_id, content):
+    """Grava a mensagem na conversa (ValueError se o conteúdo for inválido)."""
+    content = (content or '').strip()
+    if not content:
+        raise ValueError('Mensagem vazia')
+    if len(content) > Config.CHAT_MAX_MESSAGE_LENGTH:
+        raise ValueError(f'Mensagem maior que {Config.CHAT_MAX_MESSAGE_LENGTH} caracteres')
+    
+    message = db.create_message({
+        'conversation_id': conversation_id,
+        'sender_id': user_id,
+        'sender_type': user_type,
+        'content': content
+    })
+    if message:
+        db.increment_unread(conversation_id, counterpart_type(user_type))
+    return message
+
+
+def counterpart_type(user_type):
+    """Tipo do outro participante da conversa."""
+    return 'professional' if user_type == 'client' else 'client'
+
+
+def mark_conversation_read(conversation_id, user_type):
+    """Zera as mensagens não lidas do usuário na conversa."""
+    db.reset_unread(conversation_id, user_type)
+
+
+def _load_tail(conversation_id):
+    """Tail da conversa, carregado do banco se ainda não estiver em memória."""
+    tail = message_tails.get(conversation_id)
+    if tail is not None:
+        return tail
+    
+    # Uma mensagem gravada durante a consulta invalida o resultado (não guarda)
+    load = {'stale': False}
+    with _tail_lock:
+        _pending_loads.setdefault(conversation_id, []).append(load)
+    try:
+        messages = db.get_latest_messages(conversation_id, Config.CHAT_TAIL_SIZE)
+    finally:
+        with _tail_lock:
+            loads = _pending_loads[conversation_id]
+            loads.remove(load)
+            if not loads:
+                del _pending_loads[conversation_id]
+    tail = {
+        'messages': deque(messages, maxlen=Config.CHAT_TAIL_SIZE),
+        'complete': len(messages) < Config.CHAT_TAIL_SIZE
+    }
+    with _tail_lock:
+        if not load['stale']:
+            message_tails.set(conversation_id, tail)
+    return tail
+
+
+def _mark_loads_stale(conversation_id):
+    for load in _pending_loads.get(conversation_id, ()):
+        load['stale'] = True
+
+
+def _append_to_tail(message):
+    conversation_id = message.get('conversation_id')
+    with _tail_lock:
+        _mark_loads_stale(conversation_id)
+        tail = message_tails.get(conversation_id)
+        if tail is not None:
+            if len(tail['messages']) == tail['messages'].maxlen:
+                tail['complete'] = False
+            tail['messages'].append(message)
+    invalidation_bus.publish('chat_tail', conversation_id=conversation_id, message_id=message.get('id'))
+
+
+def _apply_tail_change(data):
+    """Descarta o tail que ainda não tem a mensagem (gravada em outro worker)."""
+    conversation_id = data['conversation_id']
+    with _tail_lock:
+        tail = message_tails.get(conversation_id)
+        if tail is not None and any(m.get('id') == data['message_id'] for m in tail['messages']):
+            return
+        _mark_loads_stale(conversation_id)
+        message_tails.discard(conversation_id)
+
+
+def sync_messages(conversation_id, after_id=None, after=None, limit=None):
+    """Mensagens depois de ``after_id`` (ou do instante ``after``), mais antigas primeiro.
+    
+    Retorna (mensagens, has_more); sem referência devolve o início do histórico.
+    """
+    limit = page_size(limit)
+    
+    if after_id is not None and Config.CHAT_TAIL_SIZE > 0:
+        tail = _load_tail(conversation_id)
+        messages = list(tail['messages'])
+        # O tail responde se cobre tudo depois de after_id
+        if tail['complete'] or (messages and messages[0]['id'] <= after_id):
+            newer = [m for m in messages if m['id'] > after_id]
+            return newer[:limit], len(newer) > limit
+    
+    rows = db.get_messages_since(conversation_id, after_id=after_id, after=after, limit=limit + 1)
+    return rows[:limit], len(rows) > limit
+
+
+# Mensagens gravadas neste processo entram no tail da conversa; as dos outros o descartam
+db.on_write('chat_messages', _append_to_tail)
+invalidation_bus.subscribe('chat_tail', _apply_tail_change)
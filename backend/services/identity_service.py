@@ -0,0 +1,66 @@
+"""Serviço de identidade - resolve email -> usuário para login e cadastro.
+
+O cache guarda o hash da senha; por isso cadastros e alterações de usuário
+o invalidam em todos os workers pelo ``invalidation_bus``.
+"""
+from concurrent_database import concurrent_db, run_concurrently
+from cache import TTLCache
+from config import Config
+from database import db
+from message_bus import invalidation_bus
+
+# Apenas emails encontrados são guardados; um email novo sempre vai ao banco
+identity_cache = TTLCache(maxsize=Config.IDENTITY_CACHE_SIZE, ttl=Config.IDENTITY_CACHE_TTL)
+
+
+def find_identity(email):
+    """Resolve email -> tipo, id, nome e hash da senha, direto no banco.
+    
+    Consulta clientes e profissionais em paralelo, então o custo é o de
+    uma única ida ao banco. Se o email existir nas duas tabelas, o cadastro
+    de cliente prevalece (mesma ordem do login).
+    """
+    client, professional = run_concurrently(
+        concurrent_db.get_client_by_email(email, projection='auth'),
+        concurrent_db.get_professional_by_email(email, projection='auth')
+    )
+    if client:
+        return {**client, 'user_type': 'client'}
+    if professional:
+        return {**professional, 'user_type': 'professional'}
+    return None
+
+
+def lookup_identity(email):
+    """Retorna {'user_type', 'id', 'nome', 'email', 'senha'} do email ou None."""
+    identity = identity_cache.get(email)
+    if identity is None:
+        identity = find_identity(email)
+        if identity:
+            identity_cache.set(email, identity)
+    return dict(identity) if identity else None
+
+
+def invalidate_identity(email=None, user_type=None, user_id=None):
+    """Remove do cache a identidade do email e/ou do usuário (tipo, id)."""
+    if email:
+        identity_cache.discard(email)
+    if user_id is not None:
+        identity_cache.discard_where(
+            lambda _, identity: identity['id'] == user_id and identity['user_type'] == user_type)
+
+
+def _on_user_write(user_type):
+    def callback(row):
+        invalidation_bus.publish('identity', email=row.get('email'), user_type=user_type, user_id=row.get('id'))
+    return callback
+
+
+def _apply_identity_change(data):
+    invalidate_identity(data.get('email'), data.get('user_type'), data.get('user_id'))
+
+
+# Cadastro e atualização de perfil invalidam o cache (em todos os workers)
+db.on_write('clientes', _on_user_write('client'))
+db.on_write('professionals', _on_user_write('professional'))
+invalidation_bus.subscribe('identity', _apply_identity_change)
@@ -1,51 +1,76 @@
 """Serviço de informações gerais (barbeiros, serviços, notificações, relatórios)."""
-from database import db
-from datetime import datetime, timedelta
+from flask import session
+from concurrent_database import submit_background
+from cache import StaleWhileRevalidateCache
+from conditional import version_stamps
+from config import Config
+from database import db, page_size, split_page
+
+from .report_service import week_report
+
+
+# Catálogo público (barbeiros e serviços); invalidado em todos os workers nas escritas dessas tabelas
+catalog_cache = StaleWhileRevalidateCache(submit_background, maxsize=16, ttl=Config.CATALOG_CACHE_TTL,
+                                          stale_ttl=Config.CATALOG_STALE_TTL)
 
 
 def list_barbers():
     """Lista todos os barbeiros."""
-    professionals = db.get_all_professionals()
-    return professionals
+    professionals = catalog_cache.get_or_load(
+        'barbers', lambda: db.get_all_professionals(projection='card'))
+    return list(professionals)
 
 
 def list_services():
     """Lista todos os serviços."""
-    services = db.get_all_services()
-    return services
-
+    services = catalog_cache.get_or_load('services', db.get_all_services)
+    return list(services)
 
-def list_notifications():
-    """Lista notificações (placeholder - implementar conforme necessário)."""
-    # TODO: Implementar sistema de notificações
-    return []
 
-
-def report_week():
-    """Gera relatório da semana."""
-    # Calcular data de início da semana (7 dias atrás)
-    today = datetime.now()
-    week_ago = today - timedelta(days=7)
-    week_ago_str = week_ago.strftime("%Y-%m-%d")
-    
-    # Buscar agendamentos da semana
-    # TODO: Implementar busca por período no Supabase
-    appointments = []  # Placeholder
+def list_notifications(limit=None, cursor=None):
+    """Lista uma página de notificações do usuário atual.
     
-    # Calcular estatísticas
-    total_appointments = len(appointments)
-    completed = len([a for a in appointments if a.get('status') == "concluido"])
-    cancelled = len([a for a in appointments if a.get('status') == "cancelado"])
-    pending = len([a for a in appointments if a.get('status') == "agendado"])
+    Retorna (notificações, próximo_cursor); sem login a lista é vazia.
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return [], None
     
-    # Calcular receita (apenas agendamentos concluídos)
-    revenue = sum(a.get('total_price', 0) or 0 for a in appointments if a.get('status') == "concluido")
+    user_type = session.get("user_type")
+    limit = page_size(limit)
+    notifications = db.get_user_notifications(user_id, user_type, limit + 1, cursor)
+    return split_page(notifications, limit)
+
+
+def report_week(professional_id=None):
+    """Gera relatório da semana (geral ou de um profissional)."""
+    start, end, totals = week_report.totals(professional_id)
     
     return {
-        "period": f"{week_ago_str} até {today.strftime('%Y-%m-%d')}",
-        "total_appointments": total_appointments,
-        "completed": completed,
-        "cancelled": cancelled,
-        "pending": pending,
-        "revenue": revenue
+        "period": f"{start} até {end}",
+        "total_appointments": totals['total'],
+        "completed": totals['completed'],
+        "cancelled": totals['cancelled'],
+        "pending": totals['pending'],
+        "revenue": totals['revenue']
     }
+
+CATALOG_KEYS = ('barbers', 'services')
+
+
+def _on_catalog_write(key):
+    def callback(_):
+        version_stamps.bump(key)
+    return callback
+
+
+def _invalidate_catalog(key):
+    if key in CATALOG_KEYS:
+        catalog_cache.invalidate(key)
+
+
+# Cadastro e edição de profissionais e serviços mudam o ETag do catálogo em todos os
+# workers; cada um descarta o seu catálogo antes de a nova versão valer
+db.on_write('professionals', _on_catalog_write('barbers'))
+db.on_write('services', _on_catalog_write('services'))
+version_stamps.on_change(_invalidate_catalog)
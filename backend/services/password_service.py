@@ -0,0 +1,120 @@
+"""Serviço de senhas - hash e verificação em um pool de processos.
+
+Gerar e conferir hashes é caro de propósito. Rodar isso dentro da requisição
+trava o loop do gevent (e todas as conexões) durante o cálculo, então o
+trabalho vai para um pool de processos com fila limitada. Enquanto espera o
+resultado, a requisição apenas aguarda o future; com o monkey patch do
+gevent (feito no início do app.py) essa espera e a da vaga na fila liberam
+os outros greenlets.
+
+Cada worker web tem o seu pool; por padrão os núcleos da máquina são
+divididos entre os workers (``HASH_WORKERS`` = núcleos / ``WEB_CONCURRENCY``),
+para que o total de processos de hashing não passe do número de núcleos.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from config import Config
+
+
+class HashQueueFull(Exception):
+    """A fila de hashing está cheia; a requisição deve ser recusada."""
+
+
+class PasswordHasher:
+    """Pool de processos para hash de senhas com fila limitada e métricas."""
+
+    def __init__(self, workers=None, queue_size=None, queue_timeout=None):
+        self.workers = Config.HASH_WORKERS if workers is None else workers
+        self.queue_size = Config.HASH_QUEUE_SIZE if queue_size is None else queue_size
+        self.queue_timeout = Config.HASH_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def _executor(self):
+        """Cria o pool sob demanda, uma vez por processo (inclusive após fork)."""
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                context = multiprocessing.get_context(Config.HASH_START_METHOD or None)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                self._pid = os.getpid()
+            return self._pool
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._rejected += 1
+            raise HashQueueFull("Muitas autenticações em andamento, tente novamente")
+
+        with self._lock:
+            self._pending += 1
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            if self.workers <= 0:
+                # Sem pool configurado: calcula no próprio processo
+                result = func(*args)
+            else:
+                result = self._executor().submit(func, *args).result()
+            succeeded = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._pending -= 1
+                if succeeded:
+                    # Latência apenas dos hashes concluídos
+                    self._completed += 1
+                    self._total_seconds += elapsed
+                    self._max_seconds = max(self._max_seconds, elapsed)
+                else:
+                    self._failed += 1
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def stats(self):
+        """Profundidade da fila, falhas e latência dos hashes concluídos (em ms)."""
+        with self._lock:
+            average = self._total_seconds / self._completed if self._completed else 0.0
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'queue_depth': self._pending,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'avg_ms': round(average * 1000, 2),
+                'max_ms': round(self._max_seconds * 1000, 2)
+            }
+
+
+# Instância global do pool de hashing
+password_hasher = PasswordHasher()
+
+
+def hash_password(password):
+    """Gera o hash da senha no pool (HashQueueFull se a fila estiver cheia)."""
+    return password_hasher.hash(password)
+
+
+def verify_password(password_hash, password):
+    """Confere a senha contra o hash no pool (HashQueueFull se a fila estiver cheia)."""
+    return password_hasher.verify(password_hash, password)
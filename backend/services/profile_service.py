@@ -0,0 +1,102 @@
+"""Serviço de perfil em sessão - resumo do usuário guardado no cookie assinado.
+
+No login o resumo do perfil vai para a sessão com o instante em que foi
+lido. ``/api/auth/me`` responde direto da sessão enquanto o resumo for mais
+novo que a última escrita no perfil do usuário.
+
+O instante da última escrita é avisado a todos os workers pelo
+``invalidation_bus``, então uma alteração feita em um worker vale para os
+outros. Um processo não conhece as escritas anteriores ao seu início, por
+isso resumos mais antigos que o processo são relidos uma vez. A idade
+máxima (``PROFILE_SNAPSHOT_MAX_AGE``) continua como limite de segurança.
+"""
+import threading
+import time
+
+from flask import session
+
+from config import Config
+from database import db
+from message_bus import invalidation_bus
+
+# Início deste processo: escritas anteriores a ele não estão em _last_writes
+_started = time.time()
+_last_writes = {}
+_last_writes_lock = threading.Lock()
+
+
+def profile_changed_at(user_type, user_id):
+    """Instante da última escrita conhecida no perfil (ou o início do processo)."""
+    return max(_last_writes.get((user_type, user_id), 0.0), _started)
+
+
+def mark_profile_changed(user_type, user_id):
+    """Invalida, em todos os workers, os resumos de perfil já emitidos para o usuário."""
+    invalidation_bus.publish('profile', user_type=user_type, user_id=user_id, at=time.time())
+
+
+def _apply_profile_change(data):
+    key = (data['user_type'], data['user_id'])
+    with _last_writes_lock:
+        _last_writes[key] = max(_last_writes.get(key, 0.0), data['at'])
+        if len(_last_writes) > 1024:
+            # Resumos mais velhos que a idade máxima já são recusados; essas escritas não importam mais
+            oldest = time.time() - Config.PROFILE_SNAPSHOT_MAX_AGE
+            for stale in [k for k, at in _last_writes.items() if at < oldest]:
+                del _last_writes[stale]
+
+
+invalidation_bus.subscribe('profile', _apply_profile_change)
+
+
+def profile_summary(user, user_type):
+    """Resumo público do usuário (formato de /api/auth/me)."""
+    return {
+        'id': user['id'],
+        'name': user['nome'],
+        'email': user['email'],
+        'type': user_type,
+        'phone': user.get('telefone'),
+        'address': user.get('endereco', '')
+    }
+
+
+def store_profile_snapshot(user, user_type):
+    """Guarda o resumo do perfil na sessão, com o instante da leitura, e o retorna."""
+    summary = profile_summary(user, user_type)
+    session['profile'] = {
+        'at': time.time(),
+        'user': summary
+    }
+    return summary
+
+
+def current_profile_snapshot():
+    """Resumo da sessão se ainda for válido para o usuário logado, senão None."""
+    snapshot = session.get('profile')
+    user_id = session.get('user_id')
+    user_type = session.get('user_type')
+    if not snapshot or not user_id:
+        return None
+
+    user = snapshot.get('user') or {}
+    if user.get('id') != user_id or user.get('type') != user_type:
+        return None
+    read_at = snapshot.get('at', 0)
+    if read_at <= profile_changed_at(user_type, user_id):
+        return None
+    if time.time() - read_at > Config.PROFILE_SNAPSHOT_MAX_AGE:
+        return None
+    return user
+
+
+def _on_profile_write(user_type):
+    def callback(row):
+        if row.get('id') is not None:
+            mark_profile_changed(user_type, row['id'])
+    return callback
+
+
+# Alterações de perfil invalidam os resumos já guardados nas sessões
+db.on_write('clientes', _on_profile_write('client'))
+db.on_write('professionals', _on_profile_write('professional'))
@@ -0,0 +1,174 @@
+"""Serviço de relatórios - contadores diários materializados.
+
+Os contadores (total, concluídos, cancelados, pendentes e receita) ficam em
+memória por dia e por profissional, além de um total global. As rotas de
+escrita de agendamentos atualizam os contadores, de modo que a leitura do
+relatório apenas soma os dias da janela. As alterações são avisadas a todos
+os workers pelo ``invalidation_bus``, então cada um mantém o seu relatório
+em dia com as escritas dos outros.
+"""
+import threading
+import time as _time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from config import Config
+from database import db
+from message_bus import invalidation_bus
+
+REPORT_DAYS = 7
+
+# Campos do agendamento usados pelo relatório (enviados aos outros workers)
+REPORT_FIELDS = ('id', 'date', 'profissional_id', 'status', 'total_price')
+
+_STATUS_FIELDS = {
+    'concluido': 'completed',
+    'cancelado': 'cancelled',
+    'agendado': 'pending'
+}
+
+
+def _empty_counters():
+    return {'total': 0, 'completed': 0, 'cancelled': 0, 'pending': 0, 'revenue': 0.0}
+
+
+def _window(today=None):
+    """Primeiro e último dia ('YYYY-MM-DD') da janela do relatório."""
+    today = today or datetime.now().date()
+    return (today - timedelta(days=REPORT_DAYS)).isoformat(), today.isoformat()
+
+
+class WeeklyReport:
+    """Contadores diários por profissional (chave None = global)."""
+
+    def __init__(self, max_age=None):
+        self.max_age = Config.REPORT_MAX_AGE if max_age is None else max_age
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._pending = None  # alterações recebidas durante um recálculo
+        self._days = {}
+        self._appointments = {}  # id -> (date, profissional_id, status, preço)
+        self._since = None
+        self._built_at = None
+
+    @staticmethod
+    def _apply(days, entry, sign):
+        date, professional_id, status, price = entry
+        day = days.setdefault(date, defaultdict(_empty_counters))
+        for key in (professional_id, None):
+            counters = day[key]
+            counters['total'] += sign
+            field = _STATUS_FIELDS.get(status)
+            if field:
+                counters[field] += sign
+            if status == 'concluido':
+                counters['revenue'] += sign * price
+
+    @staticmethod
+    def _entry(appointment):
+        return (appointment['date'], appointment.get('profissional_id'),
+                appointment.get('status'), float(appointment.get('total_price') or 0))
+
+    def _stale(self):
+        return self._built_at is None or _time.monotonic() - self._built_at > self.max_age
+
+    def rebuild(self):
+        """Recalcula os contadores com uma única passada pela tabela.
+
+        Alterações registradas durante a passada são reaplicadas sobre o
+        resultado (o estado de cada agendamento é absoluto, então reaplicar
+        o que a passada já leu não muda nada).
+        """
+        with self._rebuild_lock:
+            since, _ = _window()
+            with self._lock:
+                self._pending = []
+            days, appointments = {}, {}
+            try:
+                for appointment in db.iter_appointments_since(since, projection='report'):
+                    entry = self._entry(appointment)
+                    appointments[appointment['id']] = entry
+                    self._apply(days, entry, 1)
+            except Exception:
+                with self._lock:
+                    self._pending = None
+                raise
+            with self._lock:
+                pending, self._pending = self._pending, None
+                self._days, self._appointments = days, appointments
+                self._since = since
+                self._built_at = _time.monotonic()
+                for appointment, created in pending:
+                    self._record(appointment, created)
+            return len(appointments)
+
+    def record(self, appointment, created=False):
+        """Aplica a criação ou mudança de status de um agendamento."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((appointment, created))
+            self._record(appointment, created)
+
+    def _record(self, appointment, created):
+        if self._built_at is None or appointment['date'] < self._since:
+            return
+        previous = self._appointments.get(appointment['id'])
+        if previous:
+            self._apply(self._days, previous, -1)
+        elif not created:
+            # Agendamento desconhecido (aviso perdido): o status anterior não é conhecido
+            self._built_at = None
+            return
+        entry = self._entry(appointment)
+        self._appointments[appointment['id']] = entry
+        self._apply(self._days, entry, 1)
+
+    def invalidate(self):
+        """Força o recálculo na próxima leitura."""
+        with self._lock:
+            self._built_at = None
+
+    def totals(self, professional_id=None):
+        """Soma os contadores da janela atual."""
+        if self._stale():
+            self.rebuild()
+        today = datetime.now().date()
+        start, end = _window(today)
+        totals = _empty_counters()
+        with self._lock:
+            for offset in range(REPORT_DAYS + 1):
+                date = (today - timedelta(days=offset)).isoformat()
+                counters = self._days.get(date, {}).get(professional_id)
+                if counters:
+                    for field, value in counters.items():
+                        totals[field] += value
+        return start, end, totals
+
+
+# Instância global do relatório
+week_report = WeeklyReport()
+
+
+def record_appointments(appointments, created=False):
+    """Atualiza o relatório de todos os workers com o estado atual dos agendamentos."""
+    rows = [{field: appointment.get(field) for field in REPORT_FIELDS} for appointment in appointments]
+    if rows:
+        invalidation_bus.publish('report', appointments=rows, created=created)
+
+
+def record_appointment(appointment, created=False):
+    """Atualiza o relatório com o estado atual de um agendamento."""
+    record_appointments([appointment], created)
+
+
+def _apply_report_change(data):
+    for appointment in data['appointments']:
+        week_report.record(appointment, data.get('created', False))
+
+
+invalidation_bus.subscribe('report', _apply_report_change)
+
+
+def rebuild_week_report():
+    """Recalcula o relatório semanal e retorna quantos agendamentos leu."""
+    return week_report.rebuild()
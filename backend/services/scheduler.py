@@ -0,0 +1,105 @@
+"""Agendador em segundo plano - conclusão automática de agendamentos passados.
+
+Roda dentro do processo do servidor, como tarefa do Socket.IO (thread ou
+greenlet, conforme o async_mode). Com vários workers, apenas o que obtém o
+lock de arquivo executa as passadas; os outros não iniciam o agendador.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos
+    fcntl = None
+
+from config import Config
+
+from .appointment_service import auto_complete_past_appointments
+
+
+class AutoCompleteScheduler:
+    """Executa ``auto_complete_past_appointments`` a cada ``interval`` segundos."""
+
+    def __init__(self, interval=None, lock_path=None):
+        self.interval = Config.AUTO_COMPLETE_INTERVAL if interval is None else interval
+        self.lock_path = lock_path or Config.AUTO_COMPLETE_LOCK_FILE
+        self._lock_file = None
+        self._stats_lock = threading.Lock()
+        self._running = False
+        self.runs = 0
+        self.errors = 0
+        self.total_updated = 0
+        self.last_run = None
+        self.last_updated = 0
+        self.last_ms = 0.0
+
+    def _acquire_lock(self):
+        """Lock exclusivo entre processos (não bloqueante)."""
+        if fcntl is None:
+            return True
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file  # mantido aberto enquanto o processo viver
+        return True
+
+    def start(self, socketio):
+        """Inicia o laço em segundo plano; retorna False se desligado ou já em outro worker."""
+        if self._running or self.interval <= 0 or not self._acquire_lock():
+            return False
+        self._running = True
+        socketio.start_background_task(self._loop, socketio)
+        print(f"⏱️  Conclusão automática a cada {self.interval}s (pid {os.getpid()})")
+        return True
+
+    def _loop(self, socketio):
+        while self._running:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Erro na conclusão automática: {e}")
+            socketio.sleep(self.interval)
+
+    def stop(self):
+        self._running = False
+
+    def run_once(self):
+        """Executa uma passada e registra quantas linhas alterou e quanto demorou."""
+        start = time.perf_counter()
+        try:
+            updated = auto_complete_past_appointments()
+        except Exception:
+            with self._stats_lock:
+                self.errors += 1
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self.runs += 1
+            self.total_updated += updated
+            self.last_run = datetime.now().isoformat(timespec='seconds')
+            self.last_updated = updated
+            self.last_ms = round(elapsed_ms, 2)
+        return updated
+
+    def stats(self):
+        """Resumo das passadas executadas neste processo."""
+        with self._stats_lock:
+            return {
+                'running': self._running,
+                'interval': self.interval,
+                'runs': self.runs,
+                'errors': self.errors,
+                'total_updated': self.total_updated,
+                'last_run': self.last_run,
+                'last_updated': self.last_updated,
+                'last_ms': self.last_ms
+            }
+
+
+# Instância global do agendador
+auto_complete_scheduler = AutoCompleteScheduler()
@@ -0,0 +1,80 @@
+"""Índice em memória dos horários ocupados por profissional e data.
+
+Cada par (profissional_id, date) guarda um bitmap de 1440 bits (um por minuto
+do dia), em que o bit ``n`` ligado indica um agendamento ativo começando no
+minuto ``n``. A verificação de conflito vira um teste de bit.
+"""
+import threading
+import time as _time
+
+from config import Config
+
+
+def minute_of_day(time_str):
+    """Converte 'HH:MM' (ou 'HH:MM:SS') em minutos desde a meia-noite."""
+    hours, minutes = str(time_str).split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+class SlotIndex:
+    """Bitmaps de ocupação por (profissional_id, date) com expiração."""
+
+    def __init__(self, ttl=None):
+        self.ttl = Config.SLOT_INDEX_TTL if ttl is None else ttl
+        self._entries = {}  # (profissional_id, date) -> [bitmap, carregado_em]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(professional_id, date):
+        return int(professional_id), str(date)
+
+    def _fresh_entry(self, key):
+        entry = self._entries.get(key)
+        if entry and _time.monotonic() - entry[1] > self.ttl:
+            del self._entries[key]
+            return None
+        return entry
+
+    def load(self, professional_id, date, times):
+        """Substitui o bitmap da data pelos horários informados."""
+        bitmap = 0
+        for time_str in times:
+            bitmap |= 1 << minute_of_day(time_str)
+        with self._lock:
+            self._entries[self._key(professional_id, date)] = [bitmap, _time.monotonic()]
+        return bitmap
+
+    def bitmap(self, professional_id, date):
+        """Retorna o bitmap da data ou None se não estiver carregado."""
+        with self._lock:
+            entry = self._fresh_entry(self._key(professional_id, date))
+            return entry[0] if entry else None
+
+    def is_booked(self, professional_id, date, time_str):
+        """True/False se a data estiver indexada, None caso contrário."""
+        bitmap = self.bitmap(professional_id, date)
+        if bitmap is None:
+            return None
+        return bool(bitmap >> minute_of_day(time_str) & 1)
+
+    def mark(self, professional_id, date, time_str, booked):
+        """Liga ou desliga o bit do horário (apenas em datas já indexadas)."""
+        bit = 1 << minute_of_day(time_str)
+        with self._lock:
+            entry = self._fresh_entry(self._key(professional_id, date))
+            if entry is None:
+                return
+            entry[0] = entry[0] | bit if booked else entry[0] & ~bit
+
+    def discard(self, professional_id, date):
+        """Remove a data do índice, forçando nova carga."""
+        with self._lock:
+            self._entries.pop(self._key(professional_id, date), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Instância global do índice
+slot_index = SlotIndex()
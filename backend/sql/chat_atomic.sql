@@ -0,0 +1,21 @@
+-- Conversas e contadores de não lidas sem leitura antes da escrita.
+-- Executar uma vez no SQL Editor do Supabase.
+
+-- Uma conversa por par cliente/profissional (alvo do upsert em get_or_create_conversation)
+alter table chat_conversations
+    add constraint chat_conversations_cliente_profissional_key unique (cliente_id, profissional_id);
+
+alter table chat_conversations alter column cliente_unread set default 0;
+alter table chat_conversations alter column profissional_unread set default 0;
+
+-- Incrementa o contador do destinatário ('client' ou 'professional') e retorna o novo valor
+create or replace function chat_increment_unread(p_conversation_id bigint, p_recipient text)
+returns integer
+language sql
+as $$
+    update chat_conversations
+       set cliente_unread = cliente_unread + (case when p_recipient = 'client' then 1 else 0 end),
+           profissional_unread = profissional_unread + (case when p_recipient = 'professional' then 1 else 0 end)
+     where id = p_conversation_id
+    returning case when p_recipient = 'client' then cliente_unread else profissional_unread end;
+$$;
@@ -0,0 +1,12 @@
+-- Um preço por profissional e serviço (alvo do upsert em set_professional_prices).
+-- Executar uma vez no SQL Editor do Supabase.
+
+-- Remove duplicados antigos, mantendo o registro mais recente
+delete from professional_prices a
+ using professional_prices b
+ where a.profissional_id = b.profissional_id
+   and a.servico_id = b.servico_id
+   and a.id < b.id;
+
+alter table professional_prices
+    add constraint professional_prices_profissional_servico_key unique (profissional_id, servico_id);
@@ -0,0 +1,12 @@
+-- Um horário por profissional e dia da semana (alvo do upsert em upsert_working_hours).
+-- Executar uma vez no SQL Editor do Supabase.
+
+-- Remove duplicados antigos, mantendo o registro mais recente
+delete from working_hours a
+ using working_hours b
+ where a.profissional_id = b.profissional_id
+   and a.dia_semana = b.dia_semana
+   and a.id < b.id;
+
+alter table working_hours
+    add constraint working_hours_profissional_dia_key unique (profissional_id, dia_semana);